@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Latency and throughput of async_deque against asyncio.Queue.
+
+Run with "python bench_asyncio.py [count] [maxlen]".  A producer coroutine
+pushes count timestamps through a bounded buffer of maxlen items to a
+consumer coroutine.  Prints items per second and the mean and 99th
+percentile time an item spent in the buffer, in microseconds.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, 'module_tests'))
+
+import collections_asyncio
+
+BATCH = 64
+
+
+async def run(push, pop, count, batched=False):
+    latencies = []
+    clock = time.perf_counter
+
+    async def produce():
+        for i in range(count):
+            await push(clock())
+
+    async def consume():
+        left = count
+        while left:
+            if batched:
+                stamps = await pop(BATCH)
+            else:
+                stamps = [await pop()]
+            now = clock()
+            latencies.extend(now - stamp for stamp in stamps)
+            left -= len(stamps)
+
+    start = clock()
+    await asyncio.gather(produce(), consume())
+    return clock() - start, sorted(latencies)
+
+
+def queue(count, maxlen):
+    q = asyncio.Queue(maxlen)
+    return run(q.put, q.get, count)
+
+
+def deque(count, maxlen):
+    d = collections_asyncio.async_deque(maxlen=maxlen, block=True)
+    return run(d.append, d.popleft, count)
+
+
+def deque_batched(count, maxlen):
+    d = collections_asyncio.async_deque(maxlen=maxlen, block=True)
+    return run(d.append, d.popleftmany, count, batched=True)
+
+
+def main(count, maxlen):
+    print('%-14s %12s %10s %10s' % ('buffer', 'items/sec', 'mean us', 'p99 us'))
+    for variant in (queue, deque, deque_batched):
+        elapsed, latencies = asyncio.run(variant(count, maxlen))
+        mean = sum(latencies) / len(latencies)
+        p99 = latencies[int(len(latencies) * 0.99)]
+        print('%-14s %12.0f %10.1f %10.1f' % (
+            variant.__name__, count / elapsed, mean * 1e6, p99 * 1e6))
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [100000, 1000][len(args):]))
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""Speed of consuming a collections_python.deque in batches.
+
+Run with "python bench_batch.py [length] [batch]".  Empties a deque of the
+given length with popleft() in a loop, with popleftmany(batch) and with
+drain(callback, batch), handing each element or batch to a consumer.
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, 'module_tests'))
+
+import collections_python
+
+
+def one_at_a_time(d, batch, consume):
+    popleft = d.popleft
+    while d:
+        consume([popleft()])
+
+
+def batched(d, batch, consume):
+    while d:
+        consume(d.popleftmany(batch))
+
+
+def drained(d, batch, consume):
+    d.drain(consume, batch)
+
+
+def main(length, batch):
+    print('%-14s %12s' % ('consumer', 'ms'))
+    for function in (one_at_a_time, batched, drained):
+        d = collections_python.deque(range(length))
+        seen = []
+        start = time.perf_counter()
+        function(d, batch, seen.extend)
+        elapsed = time.perf_counter() - start
+        assert seen == list(range(length))
+        print('%-14s %12.2f' % (function.__name__, elapsed * 1000))
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [1000000, 256][len(args):]))
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Sweep collections_python.deque block sizes over typical workloads.
+
+Run with "python bench_blocksize.py [size ...]".  Each row is one block
+size, each column the best of a few runs of one workload, in milliseconds.
+"""
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, 'module_tests'))
+
+import collections_python
+
+N = 100000
+SIZES = (8, 16, 30, 64, 128, 256, 1024)
+
+
+def fifo(blocksize):
+    d = collections_python.deque(blocksize=blocksize)
+    for i in range(N):
+        d.append(i)
+    for i in range(N):
+        d.popleft()
+
+
+def stack(blocksize):
+    d = collections_python.deque(blocksize=blocksize)
+    for i in range(N):
+        d.append(i)
+    for i in range(N):
+        d.pop()
+
+
+def extend(blocksize):
+    d = collections_python.deque(blocksize=blocksize)
+    items = list(range(N))
+    for i in range(10):
+        d.extend(items)
+
+
+def index(blocksize):
+    d = collections_python.deque(range(N), blocksize=blocksize)
+    rnd = random.Random(0)
+    for i in range(N):
+        d[rnd.randrange(N)]
+
+
+def rotate(blocksize):
+    d = collections_python.deque(range(N), blocksize=blocksize)
+    rnd = random.Random(0)
+    for i in range(100):
+        d.rotate(rnd.randrange(-N // 2, N // 2))
+
+
+WORKLOADS = (fifo, stack, extend, index, rotate)
+
+
+def main(sizes):
+    print('%9s' % 'blocksize' + ''.join('%10s' % w.__name__ for w in WORKLOADS))
+    for size in sizes:
+        row = []
+        for workload in WORKLOADS:
+            best = min(timeit.repeat(lambda: workload(size), number=1, repeat=3))
+            row.append('%10.1f' % (best * 1000))
+        print('%9d' % size + ''.join(row))
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or SIZES)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Iteration speed of collections_python.deque.
+
+Run with "python bench_iter.py [length]".  Times list(), sum() and
+reversed() over a deque of the given length with the cursor-based
+deque_iterator, and with the generator-based iterator deque used to have,
+reproduced below (with __next__ added so that it runs on Python 3).
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, 'module_tests'))
+
+import collections_python
+from collections_python import LFTLNK, RGTLNK
+
+
+class generator_iterator(object):
+
+    def __init__(self, deq, reverse=False):
+        self.counter = len(deq)
+        def giveup():
+            self.counter = 0
+            raise RuntimeError("deque mutated during iteration")
+        impl = reversed_impl if reverse else iter_impl
+        self._gen = impl(deq, deq.state, giveup)
+
+    def __next__(self):
+        res = next(self._gen)
+        self.counter -= 1
+        return res
+
+    def __iter__(self):
+        return self
+
+
+def iter_impl(self, original_state, giveup):
+    n = self.blocksize
+    if self.state != original_state:
+        giveup()
+    block = self.left
+    while block:
+        l, r = 0, n
+        if block is self.left:
+            l = self.leftndx
+        if block is self.right:
+            r = self.rightndx + 1
+        for elem in block[l:r]:
+            yield elem
+            if self.state != original_state:
+                giveup()
+        block = block[RGTLNK]
+
+
+def reversed_impl(self, original_state, giveup):
+    n = self.blocksize
+    if self.state != original_state:
+        giveup()
+    block = self.right
+    while block:
+        l, r = 0, n
+        if block is self.left:
+            l = self.leftndx
+        if block is self.right:
+            r = self.rightndx + 1
+        for elem in reversed(block[l:r]):
+            yield elem
+            if self.state != original_state:
+                giveup()
+        block = block[LFTLNK]
+
+
+def main(length):
+    d = collections_python.deque(range(length))
+    cases = (
+        ('list', lambda: list(generator_iterator(d)), lambda: list(d)),
+        ('sum', lambda: sum(generator_iterator(d)), lambda: sum(d)),
+        ('reversed', lambda: list(generator_iterator(d, True)),
+                     lambda: list(reversed(d))),
+    )
+    print('%-10s %12s %12s %8s' % ('operation', 'generator ms', 'cursor ms',
+                                   'speedup'))
+    for name, old, new in cases:
+        before = min(timeit.repeat(old, number=1, repeat=5))
+        after = min(timeit.repeat(new, number=1, repeat=5))
+        print('%-10s %12.1f %12.1f %7.2fx' % (name, before * 1000,
+                                              after * 1000, before / after))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
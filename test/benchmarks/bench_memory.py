@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Per-instance memory of collections_python.deque.
+
+Run with "python bench_memory.py [count]".  Allocates count small deques
+and reports the bytes each one costs, measured with tracemalloc.  The
+"dict" row reproduces the layout deque had before it used __slots__: the
+same attributes kept in a per-instance __dict__, next to an identical
+first block.
+"""
+
+import os
+import sys
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, 'module_tests'))
+
+import collections_python
+
+
+class dictlayout(object):
+    """Stand-in for a deque whose attributes live in its __dict__."""
+
+    def __init__(self, proto):
+        for name in collections_python.deque.__slots__:
+            if name != '__weakref__':
+                setattr(self, name, getattr(proto, name))
+        self.blocks = [list(proto.left)]
+        self.left = self.right = self.blocks[0]
+
+
+def measure(factory, count):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory() for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return (after - before) / float(count)
+
+
+def main(count):
+    # keep the block pool out of the way so every deque gets its own block
+    collections_python.freeblocks.maxblocks = 0
+    proto = collections_python.deque([1, 2, 3])
+    slotted = measure(lambda: collections_python.deque([1, 2, 3]), count)
+    unslotted = measure(lambda: dictlayout(proto), count)
+    print('%-8s %10s' % ('layout', 'bytes'))
+    print('%-8s %10.1f' % ('dict', unslotted))
+    print('%-8s %10.1f' % ('slots', slotted))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Peak memory of pickle.dumps() on a large deque.
+
+Run with "python bench_pickle.py [count]".  Pickles a deque of count
+distinct floats and reports the peak memory allocated during the dump,
+measured with tracemalloc, next to the size of the resulting pickle.  The
+"list" row reproduces the old __reduce_ex__, which passed list(self) as a
+constructor argument.  The "typed" rows pickle a typed_deque of the same
+values, in band and with the blocks sent out of band.
+"""
+
+import os
+import pickle
+import sys
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, 'module_tests'))
+
+import collections_python
+import collections_typed
+
+
+class listdeque(collections_python.deque):
+
+    __slots__ = ()
+
+    def __reduce_ex__(self, proto):
+        return type(self), (list(self), self.maxlen, self.blocksize)
+
+
+def measure(dump):
+    tracemalloc.start()
+    data = dump()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak, len(data)
+
+
+def main(count):
+    values = [i + 0.5 for i in range(count)]
+    plain = listdeque(values)
+    streamed = collections_python.deque(values)
+    typed = collections_typed.typed_deque('d', values, blocksize=1024)
+    del values
+    buffers = []
+    cases = (
+        ('list', lambda: pickle.dumps(plain, 4)),
+        ('stream', lambda: pickle.dumps(streamed, 4)),
+        ('typed', lambda: pickle.dumps(typed, 5)),
+        ('typed-oob', lambda: pickle.dumps(typed, 5,
+                                           buffer_callback=buffers.append)),
+    )
+    print('%-10s %12s %12s' % ('pickle', 'peak MB', 'pickle MB'))
+    for name, dump in cases:
+        peak, size = measure(dump)
+        print('%-10s %12.1f %12.1f' % (name, peak / 1e6, size / 1e6))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000000)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Speed of reversing a collections_python.deque.
+
+Run with "python bench_reverse.py [length]".  "pairwise" swaps the elements
+two at a time, as reverse() used to; "blocks" is reverse(), which reverses
+the block directory and then each block with slices; "view" wraps the deque
+in a reversed_deque, which moves nothing.
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, 'module_tests'))
+
+import collections_python
+
+
+def pairwise(d):
+    n = d.blocksize
+    blocks = d.blocks
+    leftblk, rightblk = d.lftblk, len(blocks) - 1
+    leftblock, rightblock = d.left, d.right
+    leftindex, rightindex = d.leftndx, d.rightndx
+    for i in range(len(d) // 2):
+        assert leftblock is not rightblock or leftindex < rightindex
+        (rightblock[rightindex], leftblock[leftindex]) = (
+            leftblock[leftindex], rightblock[rightindex])
+        leftindex += 1
+        if leftindex == n:
+            leftblk += 1
+            leftblock = blocks[leftblk]
+            leftindex = 0
+        rightindex -= 1
+        if rightindex == -1:
+            rightblk -= 1
+            rightblock = blocks[rightblk]
+            rightindex = n - 1
+
+
+def timed(function, d):
+    start = time.perf_counter()
+    function(d)
+    return time.perf_counter() - start
+
+
+def main(length):
+    d = collections_python.deque(range(length))
+    results = (
+        ('pairwise', timed(pairwise, d)),
+        ('blocks', timed(collections_python.deque.reverse, d)),
+        ('view', timed(collections_python.reversed_deque, d)),
+    )
+    assert d[0] == 0
+    print('%-10s %12s' % ('reverse', 'ms'))
+    for name, seconds in results:
+        print('%-10s %12.3f' % (name, seconds * 1000))
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [1000000][len(args):]))
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Rolling-window throughput of ring_deque against a bounded deque.
+
+Run with "python bench_ring.py [count] [window]".  Feeds count values into
+a window of the given size, in batches of 100, and reads the window's sum
+and maximum after every batch.  The bounded collections_python.deque takes
+the values one append() at a time and is reduced with sum() and max();
+ring_deque takes each batch with one vectorized extend() and reduces in
+place.  Needs NumPy.
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, 'module_tests'))
+
+import numpy
+
+import collections_numpy
+import collections_python
+
+BATCH = 100
+
+
+def plain(values, window):
+    d = collections_python.deque(maxlen=window)
+    for start in range(0, len(values), BATCH):
+        for x in values[start:start+BATCH].tolist():
+            d.append(x)
+        sum(d), max(d)
+
+
+def ring(values, window):
+    d = collections_numpy.ring_deque(maxlen=window)
+    for start in range(0, len(values), BATCH):
+        d.extend(values[start:start+BATCH])
+        d.sum(), d.max()
+
+
+def main(count, window):
+    values = numpy.random.default_rng(0).random(count)
+    print('%-8s %12s' % ('deque', 'values/sec'))
+    for variant in (plain, ring):
+        start = time.perf_counter()
+        variant(values, window)
+        elapsed = time.perf_counter() - start
+        print('%-8s %12.0f' % (variant.__name__, count / elapsed))
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [100000, 1000][len(args):]))
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Speed of membership tests and count() on collections_python.deque.
+
+Run with "python bench_scan.py [length] [repeat]".  Looks up a value that
+is not in a deque of the given length, repeat times, with "in" and with
+count().  The "iterate" column does the same through the deque's iterator,
+which is what "in" fell back to before deque had __contains__, and with
+the loop count() used to run.
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, 'module_tests'))
+
+import collections_python
+
+
+def itercount(d, value):
+    c = 0
+    for item in d:
+        if item == value:
+            c += 1
+    return c
+
+
+def main(length, repeat):
+    d = collections_python.deque(range(length))
+    missing = -1
+    cases = (
+        ('in', lambda: missing in iter(d), lambda: missing in d),
+        ('count', lambda: itercount(d, missing), lambda: d.count(missing)),
+    )
+    print('%-8s %12s %12s %8s' % ('scan', 'iterate ms', 'blocks ms',
+                                  'speedup'))
+    for name, old, new in cases:
+        before = min(timeit.repeat(old, number=repeat, repeat=3))
+        after = min(timeit.repeat(new, number=repeat, repeat=3))
+        print('%-8s %12.1f %12.1f %7.1fx' % (name, before * 1000,
+                                             after * 1000, before / after))
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [50000, 20][len(args):]))
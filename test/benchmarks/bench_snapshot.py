@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Cost of snapshotting a live queue with collections_python.deque.
+
+Run with "python bench_snapshot.py [length] [rounds]".  A queue of the
+given length takes one snapshot per round, then moves on by a few thousand
+append()/popleft() pairs while the snapshot is read.  The "rebuild" column
+copies the elements into a new deque, as copy.copy() used to; the "shared"
+column uses snapshot(), which shares the blocks and copies one only when
+the live queue writes to it.
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, 'module_tests'))
+
+import collections_python
+
+TRAFFIC = 5000
+
+
+def run(length, rounds, take):
+    d = collections_python.deque(range(length))
+    spent = 0.0
+    total = 0
+    for r in range(rounds):
+        start = time.perf_counter()
+        snapshot = take(d)
+        spent += time.perf_counter() - start
+        for i in range(TRAFFIC):
+            d.append(i)
+            d.popleft()
+        total += snapshot[0] + snapshot[-1]
+    return spent, total
+
+
+def main(length, rounds):
+    rebuild = lambda d: collections_python.deque(d, d.maxlen, d.blocksize)
+    shared = lambda d: d.snapshot()
+    before, expected = run(length, rounds, rebuild)
+    after, total = run(length, rounds, shared)
+    assert total == expected
+    print('%10s %12s %12s %8s' % ('length', 'rebuild ms', 'shared ms',
+                                  'speedup'))
+    print('%10d %12.2f %12.2f %7.0fx' % (length, before * 1000 / rounds,
+                                         after * 1000 / rounds,
+                                         before / after))
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [1000000, 10][len(args):]))
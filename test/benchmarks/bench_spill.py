@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Memory and throughput of spill_deque against the in-memory deque.
+
+Run with "python bench_spill.py [count] [maxblocks]".  Queues count
+strings and then drains them, first through a collections_python.deque and
+then through a spill_deque limited to maxblocks resident blocks.  Prints
+the peak memory traced by tracemalloc during the fill, and the items per
+second for the fill and the drain.
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, 'module_tests'))
+
+import collections_python
+import collections_spill
+
+
+def run(d, count):
+    tracemalloc.start()
+    start = time.perf_counter()
+    for i in range(count):
+        d.append('item %d' % i)
+    filled = time.perf_counter()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    for i in range(count):
+        d.popleft()
+    drained = time.perf_counter()
+    return peak, count / (filled - start), count / (drained - filled)
+
+
+def main(count, maxblocks):
+    print('%-8s %10s %12s %12s' % ('deque', 'peak MB', 'fill/sec',
+                                   'drain/sec'))
+    for name, d in (
+            ('memory', collections_python.deque()),
+            ('spill', collections_spill.spill_deque(maxblocks=maxblocks))):
+        peak, fill, drain = run(d, count)
+        print('%-8s %10.1f %12.0f %12.0f' % (name, peak / 1e6, fill, drain))
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [1000000, 256][len(args):]))
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Speed of merging deques with collections_python.deque.splice().
+
+Run with "python bench_splice.py [shards] [length]".  Drains the given
+number of shard deques, each of the given length, into one output deque.
+"iterate" extends the output through each shard's iterator and clears the
+shard, which is what extend() did with a deque before; "splice" moves the
+shard's blocks across.  "add" and "mul" time d1 + d2 and d * 4.
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, 'module_tests'))
+
+import collections_python
+
+
+def shards(count, length):
+    # odd lengths, so that most shards do not line up with the output
+    return [collections_python.deque(range(length + i))
+            for i in range(count)]
+
+
+def iterate(output, shard):
+    output.extend(iter(shard))
+    shard.clear()
+
+
+def splice(output, shard):
+    output.splice(shard)
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def merge(count, length, drain):
+    output = collections_python.deque()
+    spent = sum(timed(drain, output, shard)
+                for shard in shards(count, length))
+    return spent, list(output)
+
+
+def main(count, length):
+    before, expected = merge(count, length, iterate)
+    after, result = merge(count, length, splice)
+    assert result == expected
+    print('%-10s %12s' % ('merge', 'ms'))
+    print('%-10s %12.2f' % ('iterate', before * 1000))
+    print('%-10s %12.2f' % ('splice', after * 1000))
+    d = collections_python.deque(range(count * length))
+    old = lambda: collections_python.deque(iter(d)).extend(iter(d))
+    print('%-10s %12.2f %12.2f' % ('add', timed(old) * 1000,
+                                   timed(lambda: d + d) * 1000))
+    old = lambda: collections_python.deque(iter(list(d) * 4))
+    print('%-10s %12.2f %12.2f' % ('mul', timed(old) * 1000,
+                                   timed(lambda: d * 4) * 1000))
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [50, 20000][len(args):]))
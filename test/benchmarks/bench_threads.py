@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Producer/consumer throughput of the thread-safe deque tiers.
+
+Run with "python bench_threads.py [count]".  One producer thread pushes
+count items while one consumer thread drains them, through locked_deque
+and through spsc_deque.  The plain deque, filled and drained in a single
+thread, is timed as a reference.  Prints the operations (pushes plus pops)
+per second for each.
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, 'module_tests'))
+
+import collections_python
+import collections_threadsafe
+
+
+def single(count):
+    d = collections_python.deque()
+    start = time.perf_counter()
+    for i in range(count):
+        d.append(i)
+    for i in range(count):
+        d.popleft()
+    return time.perf_counter() - start
+
+
+def threaded(push, pop, count):
+    def produce():
+        for i in range(count):
+            push(i)
+
+    def consume():
+        left = count
+        while left:
+            try:
+                pop()
+            except IndexError:
+                continue
+            left -= 1
+
+    threads = [threading.Thread(target=produce),
+               threading.Thread(target=consume)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def locked(count):
+    d = collections_threadsafe.locked_deque()
+    return threaded(d.append, d.popleft, count)
+
+
+def spsc(count):
+    d = collections_threadsafe.spsc_deque()
+    return threaded(d.append, d.popleft, count)
+
+
+def main(count):
+    print('%-8s %12s' % ('tier', 'ops/sec'))
+    for tier in (single, locked, spsc):
+        elapsed = min(tier(count) for i in range(3))
+        print('%-8s %12.0f' % (tier.__name__, 2 * count / elapsed))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Overhead of deque tracing, on and off.
+
+Run with "python bench_trace.py [count]".  Times count append()s followed
+by count popleft()s on:
+
+  plain      a deque that was never traced
+  untraced   a deque traced with trace() and then untraced, after
+             trace_all() and untrace_all() ran too
+  flag       a subclass that checks a module-level flag on every call, the
+             usual alternative to swapping methods, with the flag off
+  counting   a deque traced with trace()
+  timing     a deque traced with trace(histograms=True)
+
+and prints each one's time and its overhead over plain.
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, 'module_tests'))
+
+import collections_python
+import collections_trace
+
+TRACING = False
+
+
+class flagged(collections_python.deque):
+
+    __slots__ = ()
+
+    def append(self, x):
+        if TRACING:
+            pass
+        return collections_python.deque.append(self, x)
+
+    def popleft(self):
+        if TRACING:
+            pass
+        return collections_python.deque.popleft(self)
+
+
+def workload(d, count):
+    def run():
+        for i in range(count):
+            d.append(i)
+        for i in range(count):
+            d.popleft()
+    return run
+
+
+def untraced():
+    d = collections_python.deque()
+    collections_trace.trace(d)
+    collections_trace.untrace(d)
+    collections_trace.trace_all()
+    collections_trace.untrace_all()
+    return d
+
+
+def traced(histograms):
+    def make():
+        d = collections_python.deque()
+        collections_trace.trace(d, histograms)
+        return d
+    return make
+
+
+def main(count):
+    variants = (
+        ('plain', collections_python.deque),
+        ('untraced', untraced),
+        ('flag', flagged),
+        ('counting', traced(False)),
+        ('timing', traced(True)),
+    )
+    print('%-10s %10s %10s' % ('deque', 'ms', 'overhead'))
+    base = None
+    for name, make in variants:
+        elapsed = min(timeit.repeat(workload(make(), count), number=1,
+                                    repeat=5))
+        if base is None:
+            base = elapsed
+        print('%-10s %10.1f %9.1f%%' % (name, elapsed * 1000,
+                                        (elapsed / base - 1) * 100))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
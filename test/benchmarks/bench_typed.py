@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""Memory per element of typed_deque against the list-block deque.
+
+Run with "python bench_typed.py [count]".  Fills each deque with count
+distinct floats and reports the bytes per element it holds, measured with
+tracemalloc, together with the time the fill took.
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, 'module_tests'))
+
+import collections_python
+import collections_typed
+
+
+def measure(factory, count):
+    values = [i + 0.5 for i in range(count)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    d = factory()
+    # one float at a time, as a telemetry feed would, so that the list
+    # deque boxes every value itself
+    for x in values:
+        d.append(x * 1.0)
+    elapsed = time.perf_counter() - start
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / float(count), elapsed
+
+
+def main(count):
+    collections_python.freeblocks.maxblocks = 0
+    print('%-8s %12s %10s' % ('deque', 'bytes/item', 'fill ms'))
+    for name, factory in (
+            ('list', collections_python.deque),
+            ('typed', lambda: collections_typed.typed_deque('d'))):
+        size, elapsed = measure(factory, count)
+        print('%-8s %12.1f %10.1f' % (name, size, elapsed * 1000))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Per-tick cost of sliding-window aggregates.
+
+Run with "python bench_window.py [ticks] [window]".  Pushes ticks values
+through a window of the given size and reads its sum, minimum and maximum
+after every push: with sum(), min() and max() over a bounded
+collections_python.deque, and with the running aggregates of window_deque.
+Prints the ticks per second of each.
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, 'module_tests'))
+
+import collections_python
+import collections_window
+
+def rescan(values, window):
+    d = collections_python.deque(maxlen=window)
+    for x in values:
+        d.append(x)
+        sum(d), min(d), max(d)
+
+
+def running(values, window):
+    d = collections_window.window_deque(maxlen=window)
+    for x in values:
+        d.append(x)
+        d.sum(), d.min(), d.max()
+
+
+def main(ticks, window):
+    rng = random.Random(0)
+    values = [rng.random() for i in range(ticks)]
+    print('%-8s %12s' % ('window', 'ticks/sec'))
+    for variant in (rescan, running):
+        start = time.perf_counter()
+        variant(values, window)
+        elapsed = time.perf_counter() - start
+        print('%-8s %12.0f' % (variant.__name__, ticks / elapsed))
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [20000, 1000][len(args):]))
@@ -0,0 +1,112 @@
+"""asyncio-aware deque
+
+async_deque wraps a collections_python.deque for use between coroutines.
+pop() and popleft() are coroutines that wait while the deque is empty.
+With block=True, a deque with a maxlen makes append() and appendleft()
+wait for room instead of discarding items from the other end.
+popmany() and popleftmany() take a whole batch for a single wakeup.
+
+Waiters are woken in FIFO order, the same way asyncio.Queue does it.
+"""
+
+import asyncio
+import collections
+
+from collections_python import deque, n
+
+
+class async_deque(object):
+
+    __slots__ = ('_deque', '_block', '_getters', '_putters', '__weakref__')
+
+    def __init__(self, iterable=(), maxlen=None, block=False, blocksize=n):
+        if block and not maxlen:
+            raise ValueError("block=True needs a positive maxlen")
+        self._deque = deque(iterable, maxlen, blocksize)
+        self._block = block
+        self._getters = collections.deque()
+        self._putters = collections.deque()
+
+    @property
+    def maxlen(self):
+        return self._deque.maxlen
+
+    def __len__(self):
+        return len(self._deque)
+
+    def _wakeup_next(self, waiters):
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+    async def _wait(self, waiters, ready):
+        waiter = asyncio.get_running_loop().create_future()
+        waiters.append(waiter)
+        try:
+            await waiter
+        except:
+            waiter.cancel()     # in case it is not done yet
+            try:
+                waiters.remove(waiter)
+            except ValueError:
+                pass
+            # we may have been woken just before the cancellation; hand the
+            # wakeup on so that it is not lost
+            if ready() and not waiter.cancelled():
+                self._wakeup_next(waiters)
+            raise
+
+    def _has_items(self):
+        return len(self._deque) > 0
+
+    def _has_room(self):
+        return len(self._deque) < self._deque.maxlen
+
+    async def _room(self):
+        if self._block:
+            while not self._has_room():
+                await self._wait(self._putters, self._has_room)
+
+    async def _items(self):
+        while not self._has_items():
+            await self._wait(self._getters, self._has_items)
+
+    async def append(self, x):
+        await self._room()
+        self._deque.append(x)
+        self._wakeup_next(self._getters)
+
+    async def appendleft(self, x):
+        await self._room()
+        self._deque.appendleft(x)
+        self._wakeup_next(self._getters)
+
+    async def pop(self):
+        await self._items()
+        x = self._deque.pop()
+        self._wakeup_next(self._putters)
+        return x
+
+    async def popleft(self):
+        await self._items()
+        x = self._deque.popleft()
+        self._wakeup_next(self._putters)
+        return x
+
+    async def popmany(self, k):
+        """Wait for at least one item, then pop up to k from the right."""
+        await self._items()
+        items = self._deque.popmany(k)
+        for i in range(len(items)):
+            self._wakeup_next(self._putters)
+        return items
+
+    async def popleftmany(self, k):
+        """Wait for at least one item, then pop up to k from the left."""
+        await self._items()
+        items = self._deque.popleftmany(k)
+        for i in range(len(items)):
+            self._wakeup_next(self._putters)
+        return items
@@ -0,0 +1,174 @@
+"""NumPy ring buffer variant of collections_python.deque
+
+ring_deque is a deque with a fixed maxlen whose elements live in one
+preallocated NumPy array used as a circular buffer.  Appending to a full
+ring_deque overwrites the element at the other end in place, so a rolling
+window never allocates or frees anything once it is created.  extend()
+with an array is a vectorized copy that wraps around the end of the
+buffer.
+
+toarray() returns the elements in order as a new array, and view() returns
+them in order without copying, as a view on the buffer.  sum(), mean(),
+min(), max() and percentile() reduce over the buffer directly.
+
+NumPy is optional for the rest of this package; only creating a
+ring_deque needs it.
+"""
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class ring_deque(object):
+
+    __slots__ = ('_data', '_start', '_length', '__weakref__')
+
+    def __init__(self, iterable=(), maxlen=None, dtype=float):
+        if numpy is None:
+            raise ImportError("ring_deque needs NumPy")
+        if maxlen is None or maxlen <= 0:
+            raise ValueError("ring_deque needs a positive maxlen")
+        self._data = numpy.zeros(maxlen, dtype)
+        self._start = 0     # buffer index of the leftmost element
+        self._length = 0
+        self.extend(iterable)
+
+    @property
+    def maxlen(self):
+        return len(self._data)
+
+    @property
+    def dtype(self):
+        return self._data.dtype
+
+    def __len__(self):
+        return self._length
+
+    def clear(self):
+        self._start = 0
+        self._length = 0
+
+    def append(self, x):
+        data = self._data
+        capacity = len(data)
+        if self._length < capacity:
+            data[(self._start + self._length) % capacity] = x
+            self._length += 1
+        else:
+            # the slot of the leftmost element becomes the rightmost one
+            data[self._start] = x
+            self._start = (self._start + 1) % capacity
+
+    def appendleft(self, x):
+        data = self._data
+        self._start = (self._start - 1) % len(data)
+        data[self._start] = x
+        if self._length < len(data):
+            self._length += 1
+
+    def pop(self):
+        if not self._length:
+            raise IndexError("pop from an empty deque")
+        self._length -= 1
+        return self._data[(self._start + self._length) % len(self._data)]
+
+    def popleft(self):
+        if not self._length:
+            raise IndexError("pop from an empty deque")
+        x = self._data[self._start]
+        self._start = (self._start + 1) % len(self._data)
+        self._length -= 1
+        return x
+
+    def extend(self, iterable):
+        values = numpy.asarray(
+            iterable if hasattr(iterable, '__len__') else list(iterable),
+            self._data.dtype).ravel()
+        data = self._data
+        capacity = len(data)
+        count = len(values)
+        if count >= capacity:
+            # only the last maxlen values survive
+            data[:] = values[count-capacity:]
+            self._start = 0
+            self._length = capacity
+            return
+        end = (self._start + self._length) % capacity
+        first = min(count, capacity - end)
+        data[end:end+first] = values[:first]
+        data[:count-first] = values[first:]
+        self._length += count
+        if self._length > capacity:
+            self._start = (self._start + self._length - capacity) % capacity
+            self._length = capacity
+
+    def __getitem__(self, index):
+        length = self._length
+        if index < 0:
+            index += length
+        if index < 0 or index >= length:
+            raise IndexError("deque index out of range")
+        return self._data[(self._start + index) % len(self._data)]
+
+    def __iter__(self):
+        return iter(self.toarray())
+
+    def _segments(self):
+        # the one or two runs of the buffer holding the elements, in order
+        data = self._data
+        end = self._start + self._length
+        if end <= len(data):
+            return (data[self._start:end],)
+        return data[self._start:], data[:end-len(data)]
+
+    def toarray(self):
+        """Return the elements in order as a new array."""
+        return numpy.concatenate(self._segments())
+
+    def view(self):
+        """Return the elements in order as a view on the buffer.
+
+        If the elements wrap around the end of the buffer they are first
+        moved to its start.  The view is only valid until the deque is next
+        modified.
+        """
+        if self._start + self._length > len(self._data):
+            self._data[:self._length] = self.toarray()
+            self._start = 0
+        return self._data[self._start:self._start+self._length]
+
+    # Reductions run over the buffer segments in place; none of them needs
+    # the elements in order.
+
+    def _reduce(self, reduction):
+        if not self._length:
+            raise ValueError("%s of an empty deque" % (reduction.__name__,))
+        return reduction([getattr(segment, reduction.__name__)()
+                          for segment in self._segments()])
+
+    def sum(self):
+        return sum(segment.sum() for segment in self._segments())
+
+    def mean(self):
+        if not self._length:
+            raise ValueError("mean of an empty deque")
+        return self.sum() / self._length
+
+    def min(self):
+        return self._reduce(min)
+
+    def max(self):
+        return self._reduce(max)
+
+    def percentile(self, q):
+        if not self._length:
+            raise ValueError("percentile of an empty deque")
+        if self._length == len(self._data):
+            return numpy.percentile(self._data, q)
+        return numpy.percentile(self.toarray(), q)
+
+    def __repr__(self):
+        return 'ring_deque(%r, maxlen=%d, dtype=%s)' % (
+            self.toarray().tolist(), self.maxlen, self.dtype)
@@ -13,18 +13,81 @@ correctly thread-safe, like it is on CPython.
 #   (nondist/sandbox/collections/pydeque.py rev 1.1, Raymond Hettinger)
 #
 
+import sys
+from itertools import islice
+
 try:
-    from threading import _get_ident as _thread_ident
+    from threading import get_ident as _thread_ident
 except ImportError:
-    def _thread_ident():
-        return -1
-
+    try:
+        from threading import _get_ident as _thread_ident
+    except ImportError:
+        def _thread_ident():
+            return -1
 
+# A block is a list of element slots followed by two link slots.  n is the
+# default number of element slots; a deque created with blocksize=k uses
+# blocks of k+2 slots instead.  The link slots are addressed from the end
+# so that LFTLNK and RGTLNK hold for every block size.
 n = 30
-LFTLNK = n
-RGTLNK = n+1
+LFTLNK = -2
+RGTLNK = -1
 BLOCKSIZ = n+2
 
+# Upper bound on the number of spare blocks kept by the module's block pool.
+MAXFREEBLOCKS = 16
+
+# Number of items extend() and extendleft() pull from an iterator at a time.
+EXTENDCHUNK = 16 * n
+
+class blockpool(object):
+    """Bounded free-list of emptied deque blocks.
+
+    Deques take new blocks from here and give back the blocks they unlink,
+    so a queue that keeps crossing a block boundary recycles the same few
+    lists instead of allocating and freeing one each time.  Up to
+    'maxblocks' spare blocks are kept for each block size.  'hits' and
+    'misses' count the requests served from the free-list and the ones that
+    had to allocate, to help choose 'maxblocks'.
+    """
+
+    def __init__(self, maxblocks=MAXFREEBLOCKS):
+        self.maxblocks = maxblocks
+        self.hits = 0
+        self.misses = 0
+        self._free = {}     # block length -> list of spare blocks
+        self._empty = {}    # block length -> all-None template
+
+    def __len__(self):
+        return sum(len(free) for free in self._free.values())
+
+    def get(self, size=BLOCKSIZ):
+        try:
+            block = self._free[size].pop()
+        except (KeyError, IndexError):
+            self.misses += 1
+            return [None] * size
+        self.hits += 1
+        return block
+
+    def put(self, block):
+        size = len(block)
+        try:
+            free = self._free[size]
+        except KeyError:
+            free = self._free[size] = []
+            self._empty[size] = [None] * size
+        if len(free) < self.maxblocks:
+            block[:] = self._empty[size]
+            free.append(block)
+
+    def clear(self):
+        self._free.clear()
+        self._empty.clear()
+        self.hits = self.misses = 0
+
+freeblocks = blockpool()
+
 # The deque's size limit is d.maxlen.  The limit can be zero or positive, or
 # None.  After an item is added to a deque, we check to see if the size has
 # grown past the limit. If it has, we get the size back down to the limit by
@@ -33,41 +96,206 @@ BLOCKSIZ = n+2
 
 class deque(object):
 
+    __slots__ = ('left', 'right', 'leftndx', 'rightndx', 'length', 'state',
+                 'blocks', 'lftblk', '_maxlen', '_blocksize', '_shared',
+                 '__weakref__')
+
     def __new__(cls, iterable=(), *args, **kw):
         self = super(deque, cls).__new__(cls)
-        self.clear()
+        self._blocksize = n
+        # not self.clear(): subclasses may override it with a method that
+        # relies on state their own __new__ has not set up yet
+        deque.clear(self)
         return self
 
-    def __init__(self, iterable=(), maxlen=None):
-        self.clear()
+    def __init__(self, iterable=(), maxlen=None, blocksize=n):
+        # an empty deque sits in the middle of its block, which needs a free
+        # slot on either side of the centre
+        if blocksize < 3:
+            raise ValueError("blocksize must be at least 3")
         if maxlen is not None:
             if maxlen < 0:
                 raise ValueError("maxlen must be non-negative")
+        self._blocksize = blocksize
+        self.clear()
         self._maxlen = maxlen
-        add = self.append
-        for elem in iterable:
-            add(elem)
+        self.extend(iterable)
 
     @property
     def maxlen(self):
         return self._maxlen
 
+    @property
+    def blocksize(self):
+        return self._blocksize
+
     def clear(self):
-        self.right = self.left = [None] * BLOCKSIZ
+        try:
+            blocks = self.blocks[self.lftblk:]
+            # a change like any other: iterators must notice it, and the
+            # counter keeps its running total
+            state = self.state + 1
+        except AttributeError:
+            blocks = ()     # first call, from __new__()
+            state = 0
+        for block in blocks:
+            self._release(block)
+        self._shared = None
+        n = self._blocksize
+        self.right = self.left = self._newblock()
         self.rightndx = n//2   # points to last written element
         self.leftndx = n//2+1
         self.length = 0
-        self.state = 0
+        self.state = state
+        # Directory of the linked blocks, used for random access.  The left
+        # block lives at self.blocks[self.lftblk] and the right block is
+        # always self.blocks[-1]; slots before lftblk are spare room for
+        # appendleft() to grow into.
+        self.blocks = [self.left]
+        self.lftblk = 0
+
+    # Block management.  These and the link methods below are the only
+    # places that know a block is a list with link slots, so a subclass can
+    # store its elements in another kind of block by replacing them.
+
+    # what an emptied slot is set to, so that it keeps no reference alive
+    _vacant = None
+
+    # whether blocks carry link slots; the directory alone records the
+    # order of the blocks, so a subclass whose blocks have no room for
+    # links can turn them off
+    _linked = True
+
+    def _newblock(self):
+        return freeblocks.get(self._blocksize + 2)
+
+    def _freeblock(self, block):
+        freeblocks.put(block)
+
+    def _blanks(self, count):
+        return [None] * count
+
+    def _initargs(self):
+        # constructor arguments for an empty deque like this one; blocksize
+        # is only passed when it is not the default, so that subclasses
+        # with the plain (iterable, maxlen) signature keep working
+        if self._blocksize == n:
+            return ((), self.maxlen)
+        return ((), self.maxlen, self._blocksize)
+
+    def _sibling(self):
+        # an empty deque of the same kind, for results such as slices
+        return self.__class__(*self._initargs())
+
+    # Copies share blocks.  __copy__() hands the copy this deque's blocks
+    # and both deques note their ids in _shared, which is None until a
+    # deque first shares.  A shared block is never written: before a write
+    # the deque replaces it with a private copy of its occupied slots.
+    # Slots vacated in a shared block are left as they are, since the other
+    # deques may still use them, and a shared block that leaves the deque
+    # is dropped rather than pooled.  No deque ever learns that the others
+    # have let go of a block, so a block may be copied once more than
+    # needed, but deques never touch one another and need no common lock.
+    # Link slots are only maintained while a deque shares no blocks; the
+    # directory holds the order of the blocks anyway.  __copy__() clears the
+    # links of the blocks it shares and a block leaving the deque always has
+    # its links cut, so that a stale chain never keeps departed blocks, and
+    # the elements a shared block is not blanked of, alive.
+
+    def _own(self, i):
+        # the block at directory index i, made private if it is shared
+        block = self.blocks[i]
+        key = id(block)
+        if key not in self._shared:
+            return block
+        self._shared.remove(key)
+        first = self.leftndx if i == self.lftblk else 0
+        if i == len(self.blocks) - 1:
+            last = self.rightndx + 1
+        else:
+            last = self._blocksize
+        copy = self._newblock()
+        copy[first:last] = block[first:last]
+        self.blocks[i] = copy
+        if block is self.left:
+            self.left = copy
+        if block is self.right:
+            self.right = copy
+        return copy
+
+    def _ownslots(self, start, stop):
+        # make private the blocks holding slot positions start:stop, counted
+        # from slot 0 of the left block
+        if self._shared and start < stop:
+            n = self._blocksize
+            for i in range(self.lftblk + start // n,
+                           self.lftblk + (stop - 1) // n + 1):
+                self._own(i)
+
+    def _vacate(self, block, start, stop):
+        # blank slots start:stop of a block unless other deques share it
+        if not self._shared or id(block) not in self._shared:
+            block[start:stop] = self._blanks(stop - start)
+
+    def _release(self, block):
+        # dispose of a block that has left the directory
+        if self._shared and id(block) in self._shared:
+            self._shared.remove(id(block))
+        else:
+            self._freeblock(block)
+
+    def _linkright(self, newblock):
+        if self._linked and not self._shared:
+            self.right[RGTLNK] = newblock
+            newblock[LFTLNK] = self.right
+        self.right = newblock
+        self.blocks.append(newblock)
+
+    def _linkleft(self, newblock):
+        if self._linked and not self._shared:
+            self.left[LFTLNK] = newblock
+            newblock[RGTLNK] = self.left
+        self.left = newblock
+        if self.lftblk == 0:
+            # out of spare room: grow the directory by its current size so
+            # that a run of appendleft()s costs amortized O(1) per block
+            spare = len(self.blocks)
+            self.blocks[:0] = [None] * spare
+            self.lftblk = spare
+        self.lftblk -= 1
+        self.blocks[self.lftblk] = newblock
+
+    def _unlinkright(self):
+        block = self.blocks.pop()
+        self.right = self.blocks[-1]
+        if self._linked:
+            self.right[RGTLNK] = None
+            block[LFTLNK] = None
+        return block
+
+    def _unlinkleft(self):
+        block = self.left
+        self.blocks[self.lftblk] = None
+        self.lftblk += 1
+        self.left = self.blocks[self.lftblk]
+        if self._linked:
+            self.left[LFTLNK] = None
+            block[RGTLNK] = None
+        if self.lftblk > 8 and 2 * self.lftblk > len(self.blocks):
+            # a queue drifting rightwards would otherwise leave an ever
+            # growing run of dead slots at the front of the directory
+            del self.blocks[:self.lftblk]
+            self.lftblk = 0
+        return block
 
     def append(self, x):
         self.state += 1
         self.rightndx += 1
-        if self.rightndx == n:
-            newblock = [None] * BLOCKSIZ
-            self.right[RGTLNK] = newblock
-            newblock[LFTLNK] = self.right
-            self.right = newblock
+        if self.rightndx == self._blocksize:
+            self._linkright(self._newblock())
             self.rightndx = 0
+        elif self._shared:
+            self._own(len(self.blocks) - 1)
         self.length += 1
         self.right[self.rightndx] = x
         if self.maxlen is not None and self.length > self.maxlen:
@@ -77,92 +305,512 @@ class deque(object):
         self.state += 1
         self.leftndx -= 1
         if self.leftndx == -1:
-            newblock = [None] * BLOCKSIZ
-            self.left[LFTLNK] = newblock
-            newblock[RGTLNK] = self.left
-            self.left = newblock
-            self.leftndx = n-1
+            self._linkleft(self._newblock())
+            self.leftndx = self._blocksize-1
+        elif self._shared:
+            self._own(self.lftblk)
         self.length += 1
         self.left[self.leftndx] = x
         if self.maxlen is not None and self.length > self.maxlen:
             self.pop()
 
     def extend(self, iterable):
-        if iterable is self:
-            iterable = list(iterable)
-        for elem in iterable:
-            self.append(elem)
+        if isinstance(iterable, deque):
+            # a block at a time; a copy of self shares its blocks and stays
+            # as it was while self grows
+            if iterable is self:
+                iterable = self.__copy__()
+            for run in iterable._runs():
+                self._extendright(run)
+        elif isinstance(iterable, (list, tuple)):
+            self._extendright(iterable)
+        else:
+            self._extendchunks(iterable, self._extendright)
 
     def extendleft(self, iterable):
-        if iterable is self:
-            iterable = list(iterable)
-        for elem in iterable:
-            self.appendleft(elem)
+        if isinstance(iterable, deque):
+            if iterable is self:
+                iterable = self.__copy__()
+            for run in iterable._runs():
+                self._extendleft(run)
+        elif isinstance(iterable, (list, tuple)):
+            self._extendleft(iterable)
+        else:
+            self._extendchunks(iterable, self._extendleft)
+
+    def _extendchunks(self, iterable, extend):
+        # Consume in chunks so that a long iterator with a maxlen set never
+        # holds more than a few blocks' worth of surplus items.  list.extend()
+        # keeps the items it got before the iterator raised, and those are
+        # added before the exception goes on, as extending an element at a
+        # time would have left them.
+        iterator = iter(iterable)
+        while True:
+            chunk = []
+            try:
+                chunk.extend(islice(iterator, EXTENDCHUNK))
+            finally:
+                extend(chunk)
+            if len(chunk) < EXTENDCHUNK:
+                return
+
+    def _extendright(self, items):
+        n = self._blocksize
+        total = len(items)
+        if total == 0:
+            return
+        self.state += 1
+        maxlen = self.maxlen
+        if maxlen is not None and total >= maxlen:
+            # only the last maxlen items can survive the implicit popleft()s
+            self._trimleft(self.length)
+            items = items[total-maxlen:]
+            total = maxlen
+        # top up the right block, then add new blocks already filled
+        take = min(n - 1 - self.rightndx, total)
+        if take > 0:
+            if self._shared:
+                self._own(len(self.blocks) - 1)
+            start = self.rightndx + 1
+            self.right[start:start+take] = items[:take]
+            self.rightndx += take
+        pos = take
+        while pos < total:
+            take = min(n, total - pos)
+            newblock = self._newblock()
+            newblock[:take] = items[pos:pos+take]
+            self._linkright(newblock)
+            self.rightndx = take - 1
+            pos += take
+        self.length += total
+        if maxlen is not None and self.length > maxlen:
+            self._trimleft(self.length - maxlen)
+
+    def _extendleft(self, items):
+        n = self._blocksize
+        total = len(items)
+        if total == 0:
+            return
+        self.state += 1
+        maxlen = self.maxlen
+        if maxlen is not None and total >= maxlen:
+            self._trimright(self.length)
+            items = items[total-maxlen:]
+            total = maxlen
+        # items go in reversed, exactly as repeated appendleft()s leave them
+        take = min(self.leftndx, total)
+        if take > 0:
+            if self._shared:
+                self._own(self.lftblk)
+            stop = self.leftndx
+            self.left[stop-take:stop] = items[take-1::-1]
+            self.leftndx -= take
+        pos = take
+        while pos < total:
+            take = min(n, total - pos)
+            newblock = self._newblock()
+            newblock[n-take:n] = items[pos:pos+take][::-1]
+            self._linkleft(newblock)
+            self.leftndx = n - take
+            pos += take
+        self.length += total
+        if maxlen is not None and self.length > maxlen:
+            self._trimright(self.length - maxlen)
+
+    def _trimleft(self, count):
+        n = self._blocksize
+        # drop the count leftmost elements at once, freeing whole blocks
+        self.length -= count
+        while count > 0:
+            if self.left is self.right:
+                stop = self.leftndx + count
+                self._vacate(self.left, self.leftndx, stop)
+                self.leftndx = stop
+                break
+            span = n - self.leftndx
+            if count < span:
+                self._vacate(self.left, self.leftndx, self.leftndx + count)
+                self.leftndx += count
+                break
+            self._release(self._unlinkleft())
+            self.leftndx = 0
+            count -= span
+        if self.length == 0:
+            self.rightndx = n//2
+            self.leftndx = n//2+1
+
+    def _trimright(self, count):
+        n = self._blocksize
+        # drop the count rightmost elements at once, freeing whole blocks
+        self.length -= count
+        while count > 0:
+            if self.left is self.right:
+                start = self.rightndx + 1 - count
+                self._vacate(self.right, start, self.rightndx + 1)
+                self.rightndx = start - 1
+                break
+            span = self.rightndx + 1
+            if count < span:
+                start = span - count
+                self._vacate(self.right, start, span)
+                self.rightndx = start - 1
+                break
+            self._release(self._unlinkright())
+            self.rightndx = n-1
+            count -= span
+        if self.length == 0:
+            self.rightndx = n//2
+            self.leftndx = n//2+1
+
+    # splice() moves another deque's blocks over instead of its elements.
+    # Every block but the end ones must stay full, so the two deques have
+    # to line up: the slot after one's last element must be the slot of
+    # the other's first element.  When they do not, the shorter one is
+    # first shifted along its blocks, by block slices.  Then at most one
+    # boundary block's elements are copied and the rest are relinked.
+
+    def _blockkind(self):
+        # deques whose blocks can be moved between them return equal kinds;
+        # None if the blocks must stay where they are
+        return (list, self._blocksize)
+
+    def splice(self, other, left=False):
+        """Move every element of the deque other onto the right end, or
+        the left end if left is true, leaving other empty.
+
+        Blocks are moved rather than copied when both deques use the same
+        kind of blocks.  As with extend(), elements beyond maxlen are
+        discarded from the other end.
+        """
+        if not isinstance(other, deque):
+            raise TypeError("splice() needs a deque")
+        if other is self:
+            raise ValueError("cannot splice a deque onto itself")
+        kind = self._blockkind()
+        if kind is None or kind != other._blockkind():
+            if left:
+                self.extendleft(reversed(other))
+            else:
+                self.extend(other)
+            other.clear()
+            return
+        if not other.length:
+            return
+        self.state += 1
+        n = self._blocksize
+        if left:
+            shift = (other.rightndx + 1 - self.leftndx) % n
+        else:
+            shift = (other.leftndx - self.rightndx - 1) % n
+        if shift and self.length:
+            if other.length <= self.length:
+                other._shift(n - shift)
+            else:
+                self._shift(shift)
+        if self._shared and other._shared:
+            # a block may not appear twice in one directory
+            common = self._shared & other._shared
+            if common:
+                for i in range(other.lftblk, len(other.blocks)):
+                    if id(other.blocks[i]) in common:
+                        other._own(i)
+        moved = other.blocks[other.lftblk:]
+        if other._shared:
+            shared = other._shared.intersection(map(id, moved))
+            if shared:
+                if self._shared is None:
+                    self._shared = set()
+                self._shared |= shared
+                other._shared -= shared
+        length = other.length
+        leftndx, rightndx = other.leftndx, other.rightndx
+        del other.blocks[other.lftblk:]
+        other.clear()
+        if not self.length:
+            self._release(self.left)
+            self.blocks = moved
+            self.lftblk = 0
+            self.left = moved[0]
+            self.right = moved[-1]
+            self.leftndx, self.rightndx = leftndx, rightndx
+        elif left:
+            if self.leftndx:
+                # the elements of other's right block fill self's left one
+                block = moved.pop()
+                start = leftndx if not moved else 0
+                stop = self.leftndx
+                if self._shared:
+                    self._own(self.lftblk)
+                self.left[start:stop] = block[start:stop]
+                self._release(block)
+                self.leftndx = start
+            for block in reversed(moved):
+                self._linkleft(block)
+            if moved:
+                self.leftndx = leftndx
+        else:
+            if self.rightndx < n-1:
+                block = moved.pop(0)
+                start = self.rightndx + 1
+                stop = rightndx + 1 if not moved else n
+                if self._shared:
+                    self._own(len(self.blocks) - 1)
+                self.right[start:stop] = block[start:stop]
+                self._release(block)
+                self.rightndx = stop - 1
+            for block in moved:
+                self._linkright(block)
+            if moved:
+                self.rightndx = rightndx
+        self.length += length
+        maxlen = self.maxlen
+        if maxlen is not None and self.length > maxlen:
+            if left:
+                self._trimright(self.length - maxlen)
+            else:
+                self._trimleft(self.length - maxlen)
+
+    def _shift(self, count):
+        # Move every element count slots to the right, 0 < count < n,
+        # adding a block on the right or dropping the left one as needed.
+        n = self._blocksize
+        if self.rightndx + count >= n:
+            self._linkright(self._newblock())
+            self.rightndx -= n
+        start = self.leftndx
+        self._moveslots(start, start + count, self.length)
+        self.rightndx += count
+        self.leftndx += count
+        self._vacate(self.left, start, min(start + count, n))
+        if self.leftndx >= n:
+            self._release(self._unlinkleft())
+            self.leftndx -= n
+            self._vacate(self.left, 0, self.leftndx)
 
     def pop(self):     
         if self.left is self.right and self.leftndx > self.rightndx:
             raise IndexError("pop from an empty deque")
         x = self.right[self.rightndx]
-        self.right[self.rightndx] = None
+        if not self._shared or id(self.right) not in self._shared:
+            self.right[self.rightndx] = self._vacant
         self.length -= 1
         self.rightndx -= 1
         self.state += 1  
         if self.rightndx == -1:
-            prevblock = self.right[LFTLNK]
-            if prevblock is None:
+            if self.left is self.right:
                 # the deque has become empty; recenter instead of freeing block
-                self.rightndx = n//2
-                self.leftndx = n//2+1
+                self.rightndx = self._blocksize//2
+                self.leftndx = self._blocksize//2+1
             else:
-                prevblock[RGTLNK] = None
-                self.right[LFTLNK] = None
-                self.right = prevblock
-                self.rightndx = n-1
+                self._release(self._unlinkright())
+                self.rightndx = self._blocksize-1
         return x
 
     def popleft(self):
-        
         if self.left is self.right and self.leftndx > self.rightndx:
             raise IndexError("pop from an empty deque")
         x = self.left[self.leftndx]
-        self.left[self.leftndx] = None
+        if not self._shared or id(self.left) not in self._shared:
+            self.left[self.leftndx] = self._vacant
         self.length -= 1
         self.leftndx += 1
         self.state += 1
-        print("rightndx: " + str(self.rightndx))
-        if self.leftndx == n:
-            prevblock = self.left[RGTLNK]
-            if prevblock is None:
+        if self.leftndx == self._blocksize:
+            if self.left is self.right:
                 # the deque has become empty; recenter instead of freeing block
-                self.rightndx = n//2
-                self.leftndx = n//2+1
+                self.rightndx = self._blocksize//2
+                self.leftndx = self._blocksize//2+1
             else:
-                prevblock[LFTLNK] = None
-                self.left[RGTLNK] = None
-                self.left = prevblock
+                self._release(self._unlinkleft())
                 self.leftndx = 0
         return x
 
+    # Batch pops copy whole block slices into the result and then drop the
+    # popped elements with one trim, which frees the emptied blocks
+    # together and bumps the state once per batch.
+
+    def popmany(self, k):
+        """Pop up to k elements from the right and return them as a list,
+        rightmost first."""
+        count = min(k, self.length)
+        if count <= 0:
+            return []
+        items = []
+        for block, first, last in self._ranges(self.length - count):
+            items += block[first:last]
+        items.reverse()
+        self.state += 1
+        self._trimright(count)
+        return items
+
+    def popleftmany(self, k):
+        """Pop up to k elements from the left and return them as a list,
+        leftmost first."""
+        count = min(k, self.length)
+        if count <= 0:
+            return []
+        items = []
+        for block, first, last in self._ranges(0, count):
+            items += block[first:last]
+        self.state += 1
+        self._trimleft(count)
+        return items
+
+    def drain(self, callback, batch_size=EXTENDCHUNK):
+        """Pop the elements from the left in lists of up to batch_size and
+        call callback with each list, until the deque is empty.  Return
+        the number of elements popped.
+
+        Elements the callback adds are drained too.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        total = 0
+        while self.length:
+            batch = self.popleftmany(batch_size)
+            total += len(batch)
+            callback(batch)
+        return total
+
+    # count() and "in" scan each block's occupied range with the list's own
+    # count() and index(); comparisons may run arbitrary code, so check for
+    # mutation after every block.
+
     def count(self, value):
+        state = self.state
         c = 0
-        for item in self:
-            if item == value:
-                c += 1
+        for block, start, stop in self._ranges():
+            c += block[start:stop].count(value)
+            if self.state != state:
+                raise RuntimeError("deque mutated during iteration")
         return c
 
+    def __contains__(self, value):
+        state = self.state
+        for block, start, stop in self._ranges():
+            try:
+                block.index(value, start, stop)
+            except ValueError:
+                found = False
+            else:
+                found = True
+            if self.state != state:
+                raise RuntimeError("deque mutated during iteration")
+            if found:
+                return True
+        return False
+
     def remove(self, value):
-        # Need to defend mutating or failing comparisons
-        i = 0
-        try:
-            for i in range(len(self)):
-                if self[0] == value:
-                    self.popleft()
-                    return
-                self.append(self.popleft())
-            i += 1
-            raise ValueError("deque.remove(x): x not in deque")
-        finally:
-            self.rotate(i)
+        # Find the first match with list.index() over each block's occupied
+        # range; comparisons may run arbitrary code, so check for mutation.
+        state = self.state
+        index = 0
+        for block, start, stop in self._ranges():
+            try:
+                i = block.index(value, start, stop)
+            except ValueError:
+                if self.state != state:
+                    raise IndexError("deque mutated during remove().")
+                index += stop - start
+                continue
+            if self.state != state:
+                raise IndexError("deque mutated during remove().")
+            index += i - start
+            self._delrange(index, index + 1)
+            return
+        raise ValueError("deque.remove(x): x not in deque")
+
+    def index(self, x, start=0, stop=None):
+        length = self.length
+        start, stop, step = slice(start, stop).indices(length)
+        state = self.state
+        pos = start
+        for block, first, last in self._ranges(start, stop):
+            try:
+                i = block.index(x, first, last)
+            except ValueError:
+                if self.state != state:
+                    raise RuntimeError("deque mutated during iteration")
+                pos += last - first
+                continue
+            if self.state != state:
+                raise RuntimeError("deque mutated during iteration")
+            return pos + i - first
+        raise ValueError("%r is not in deque" % (x,))
+
+    def insert(self, index, x):
+        length = self.length
+        if self.maxlen is not None and length >= self.maxlen:
+            raise IndexError("deque already at its maximum size")
+        if index < 0:
+            index = max(index + length, 0)
+        elif index > length:
+            index = length
+        self._openslots(index, 1)
+        block, i = self.__getref(index, True)
+        block[i] = x
+
+    def _openslots(self, index, count):
+        # Make room for count elements in front of a valid index: add slots
+        # at the end nearer to it, then move the elements between that end
+        # and the index into them.  The new slots hold blanks.
+        if index < self.length - index:
+            self._extendleft(self._blanks(count))
+            start = self.leftndx
+            self._moveslots(start + count, start, index)
+        else:
+            self._extendright(self._blanks(count))
+            pos = self.leftndx + index
+            self._moveslots(pos, pos + count, self.length - count - index)
+
+    def _delrange(self, start, stop):
+        # Remove the elements start:stop of a valid range by moving the
+        # shorter side over them, then dropping the slots left over at that
+        # end.
+        count = stop - start
+        if count <= 0:
+            return
+        self.state += 1
+        if start < self.length - stop:
+            left = self.leftndx
+            self._moveslots(left, left + count, start)
+            self._trimleft(count)
+        else:
+            pos = self.leftndx + stop
+            self._moveslots(pos, pos - count, self.length - stop)
+            self._trimright(count)
+
+    def _moveslots(self, src, dst, count):
+        # Move count elements from slot position src to dst, where position
+        # p is slot p % blocksize of the p // blocksize'th block counted from
+        # the left block.  Works a block-sized slice at a time and is safe
+        # for overlapping ranges.
+        n = self._blocksize
+        self._ownslots(dst, dst + count)
+        blocks = self.blocks
+        first = self.lftblk
+        if dst < src:
+            while count > 0:
+                srcblock, srcoff = divmod(src, n)
+                dstblock, dstoff = divmod(dst, n)
+                span = min(count, n - srcoff, n - dstoff)
+                blocks[first+dstblock][dstoff:dstoff+span] = (
+                    blocks[first+srcblock][srcoff:srcoff+span])
+                src += span
+                dst += span
+                count -= span
+        else:
+            src += count
+            dst += count
+            while count > 0:
+                srcblock, srcoff = divmod(src - 1, n)
+                dstblock, dstoff = divmod(dst - 1, n)
+                span = min(count, srcoff + 1, dstoff + 1)
+                blocks[first+dstblock][dstoff+1-span:dstoff+1] = (
+                    blocks[first+srcblock][srcoff+1-span:srcoff+1])
+                src -= span
+                dst -= span
+                count -= span
 
     def rotate(self, n=1):
         length = len(self)
@@ -175,92 +823,109 @@ class deque(object):
                 n -= length
             elif n < -halflen:
                 n += length
-        while n > 0:
-            self.appendleft(self.pop())
-            n -= 1
-        while n < 0:
-            self.append(self.popleft())
-            n += 1
+        self.state += 1
+        if n > 0:
+            self._rotateright(n)
+        elif n < 0:
+            self._rotateleft(-n)
+
+    # Rotation moves elements between the two ends a block slice at a time.
+    # When the left block starts at slot 0 and the right block is full, the
+    # blocks line up and whole blocks are relinked at the other end instead
+    # of being copied.  Neither helper ever empties the deque, so the end
+    # blocks are always distinct when one of them runs dry.
+
+    def _rotateright(self, k):
+        n = self._blocksize
+        while k > 0:
+            if k >= n and self.leftndx == 0 and self.rightndx == n-1:
+                self._linkleft(self._unlinkright())
+                k -= n
+                continue
+            if self.leftndx == 0:
+                self._linkleft(self._newblock())
+                self.leftndx = n
+            elif self._shared:
+                self._own(self.lftblk)
+            chunk = min(k, self.rightndx + 1, self.leftndx)
+            src = self.rightndx + 1 - chunk
+            self.left[self.leftndx-chunk:self.leftndx] = (
+                self.right[src:self.rightndx+1])
+            self._vacate(self.right, src, self.rightndx + 1)
+            self.leftndx -= chunk
+            self.rightndx -= chunk
+            k -= chunk
+            if self.rightndx == -1:
+                self._release(self._unlinkright())
+                self.rightndx = n-1
+
+    def _rotateleft(self, k):
+        n = self._blocksize
+        while k > 0:
+            if k >= n and self.leftndx == 0 and self.rightndx == n-1:
+                self._linkright(self._unlinkleft())
+                k -= n
+                continue
+            if self.rightndx == n-1:
+                self._linkright(self._newblock())
+                self.rightndx = -1
+            elif self._shared:
+                self._own(len(self.blocks) - 1)
+            chunk = min(k, n - self.leftndx, n - 1 - self.rightndx)
+            dst = self.rightndx + 1
+            self.right[dst:dst+chunk] = (
+                self.left[self.leftndx:self.leftndx+chunk])
+            self._vacate(self.left, self.leftndx, self.leftndx + chunk)
+            self.leftndx += chunk
+            self.rightndx += chunk
+            k -= chunk
+            if self.leftndx == n:
+                self._release(self._unlinkleft())
+                self.leftndx = 0
 
     def reverse(self):
         "reverse *IN PLACE*"
-        leftblock = self.left
-        rightblock = self.right
-        leftindex = self.leftndx
-        rightindex = self.rightndx
-        for i in range(self.length // 2):
-            # Validate that pointers haven't met in the middle
-            assert leftblock != rightblock or leftindex < rightindex
-
-            # Swap
-            (rightblock[rightindex], leftblock[leftindex]) = (
-                leftblock[leftindex], rightblock[rightindex])
-
-            # Advance left block/index pair
-            leftindex += 1
-            if leftindex == n:
-                leftblock = leftblock[RGTLNK]
-                assert leftblock is not None
-                leftindex = 0
-
-            # Step backwards with the right block/index pair
-            rightindex -= 1
-            if rightindex == -1:
-                rightblock = rightblock[LFTLNK]
-                assert rightblock is not None
-                rightindex = n - 1
+        # Reverse the order of the blocks in the directory and the slots of
+        # each block, a whole block at a time.  Slot j of a block becomes
+        # slot n-1-j, so the elements keep every block but the end ones full.
+        n = self._blocksize
+        if self.length <= 1:
+            return
+        self.state += 1
+        self._ownslots(self.leftndx, self.leftndx + self.length)
+        blocks = self.blocks
+        start = self.lftblk
+        order = blocks[start:]
+        order.reverse()
+        blocks[start:] = order
+        relink = self._linked and not self._shared
+        for block in order:
+            block[n-1::-1] = block[:n]
+            if relink:
+                block[LFTLNK], block[RGTLNK] = block[RGTLNK], block[LFTLNK]
+        self.left, self.right = self.right, self.left
+        self.leftndx, self.rightndx = n-1 - self.rightndx, n-1 - self.leftndx
 
-    def __repr__(self):
-        threadlocalattr = '__repr' + str(_thread_ident())
-        if threadlocalattr in self.__dict__:
+    def __repr__(self, recurse=set()):
+        # the guard is keyed by thread so that a repr() running in another
+        # thread is not mistaken for recursion
+        key = (id(self), _thread_ident())
+        if key in recurse:
             return 'deque([...])'
-        else:
-            self.__dict__[threadlocalattr] = True
-            try:
-                if self.maxlen is not None:
-                    return 'deque(%r, maxlen=%s)' % (list(self), self.maxlen)
-                else:
-                    return 'deque(%r)' % (list(self),)
-            finally:
-                del self.__dict__[threadlocalattr]
+        recurse.add(key)
+        try:
+            if self.maxlen is not None:
+                return 'deque(%r, maxlen=%s)' % (list(self), self.maxlen)
+            else:
+                return 'deque(%r)' % (list(self),)
+        finally:
+            recurse.discard(key)
 
     def __iter__(self):
-        return deque_iterator(self, self._iter_impl)
-
-    def _iter_impl(self, original_state, giveup):
-        if self.state != original_state:
-            giveup()
-        block = self.left
-        while block:
-            l, r = 0, n
-            if block is self.left:
-                l = self.leftndx
-            if block is self.right:
-                r = self.rightndx + 1
-            for elem in block[l:r]:
-                yield elem
-                if self.state != original_state:
-                    giveup()
-            block = block[RGTLNK]
+        return deque_iterator(self)
 
     def __reversed__(self):
-        return deque_iterator(self, self._reversed_impl)
-
-    def _reversed_impl(self, original_state, giveup):
-        if self.state != original_state:
-            giveup()
-        block = self.right
-        while block:
-            l, r = 0, n
-            if block is self.left:
-                l = self.leftndx
-            if block is self.right:
-                r = self.rightndx + 1
-            for elem in reversed(block[l:r]):
-                yield elem
-                if self.state != original_state:
-                    giveup()
-            block = block[LFTLNK]
+        return deque_reverse_iterator(self)
 
     def __len__(self):
         #sum = 0
@@ -271,101 +936,299 @@ class deque(object):
         #return sum + self.rightndx - self.leftndx + 1 - n
         return self.length
 
-    def __getref(self, index):
-        if index >= 0:
-            block = self.left
-            while block:
-                l, r = 0, n
-                if block is self.left:
-                    l = self.leftndx
-                if block is self.right:
-                    r = self.rightndx + 1
-                span = r-l
-                if index < span:
-                    return block, l+index
-                index -= span
-                block = block[RGTLNK]
-        else:
-            block = self.right
-            while block:
-                l, r = 0, n
-                if block is self.left:
-                    l = self.leftndx
-                if block is self.right:
-                    r = self.rightndx + 1
-                negative_span = l-r
-                if index >= negative_span:
-                    return block, r+index
-                index -= negative_span
-                block = block[LFTLNK]
-        raise IndexError("deque index out of range")
+    def __sizeof__(self):
+        size = object.__sizeof__(self) + sys.getsizeof(self.blocks)
+        for block in self.blocks[self.lftblk:]:
+            size += sys.getsizeof(block)
+        return size
+
+    def stats(self):
+        """Return a dict describing how the deque uses its blocks.
+
+        'blocks' is the number of blocks and 'slots' the element slots they
+        have, 'occupancy' the fraction of those slots in use, 'leftfree'
+        and 'rightfree' the unused slots of the end blocks, 'directory' and
+        'spare' the length of the block directory and its unused slots,
+        'mutations' the number of changes made to the deque so far, and
+        'shared' the number of blocks it may share with copies.
+        """
+        blocks = len(self.blocks) - self.lftblk
+        slots = blocks * self._blocksize
+        return {
+            'blocks': blocks,
+            'slots': slots,
+            'length': self.length,
+            'occupancy': float(self.length) / slots,
+            'leftfree': self.leftndx,
+            'rightfree': self._blocksize - 1 - self.rightndx,
+            'directory': len(self.blocks),
+            'spare': self.lftblk,
+            'mutations': self.state,
+            'shared': len(self._shared or ()),
+        }
+
+    def __getref(self, index, write=False):
+        n = self._blocksize
+        # Every block but the two end ones is full, so the position of an
+        # element counted from slot 0 of the left block gives its block and
+        # slot directly.
+        length = self.length
+        if index < 0:
+            index += length
+        if index < 0 or index >= length:
+            raise IndexError("deque index out of range")
+        blockndx, index = divmod(self.leftndx + index, n)
+        if write and self._shared:
+            return self._own(self.lftblk + blockndx), index
+        return self.blocks[self.lftblk + blockndx], index
 
     def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._getslice(index)
         block, index = self.__getref(index)
         return block[index]
 
     def __setitem__(self, index, value):
-        block, index = self.__getref(index)
+        if isinstance(index, slice):
+            self._setslice(index, value)
+            return
+        block, index = self.__getref(index, True)
         block[index] = value
 
     def __delitem__(self, index):
-        length = len(self)
-        if index >= 0:
-            if index >= length:
-                raise IndexError("deque index out of range")
-            self.rotate(-index)
-            self.popleft()
-            self.rotate(index)
+        length = self.length
+        if isinstance(index, slice):
+            start, stop, step = index.indices(length)
+            if step == 1:
+                self._delrange(start, stop)
+            elif len(range(start, stop, step)):
+                items = list(self)
+                del items[index]
+                self._trimright(length)
+                self._extendright(items)
+                self.state += 1
+            return
+        if index < 0:
+            index += length
+        if index < 0 or index >= length:
+            raise IndexError("deque index out of range")
+        self._delrange(index, index + 1)
+
+    # Slices are worked out a block at a time: _ranges() yields the slot
+    # range of each block holding part of the slice and the elements are
+    # copied with (extended) slices of those blocks.
+
+    def _items(self, iterable):
+        # the values of iterable, ready to be stored into blocks
+        return list(iterable)
+
+    def _getslice(self, index):
+        start, stop, step = index.indices(self.length)
+        result = self._sibling()
+        if not len(range(start, stop, step)):
+            return result
+        if step > 0:
+            add = result._extendright
         else:
-            index = ~index
-            if index >= length:
-                raise IndexError("deque index out of range")
-            self.rotate(index)
-            self.pop()
-            self.rotate(-index)
+            # walk the same positions left to right and prepend each run,
+            # which reverses them
+            count = len(range(start, stop, step))
+            start, stop, step = start + step * (count - 1), start + 1, -step
+            add = result._extendleft
+        pos = start
+        for block, first, last in self._ranges(start, stop):
+            skip = (start - pos) % step
+            add(block[first+skip:last:step])
+            pos += last - first
+        return result
+
+    def _setslice(self, index, value):
+        items = self._items(value)
+        start, stop, step = index.indices(self.length)
+        if step != 1:
+            positions = range(start, stop, step)
+            if len(items) != len(positions):
+                raise ValueError("attempt to assign sequence of size %d to "
+                                 "extended slice of size %d"
+                                 % (len(items), len(positions)))
+            for pos, x in zip(positions, items):
+                block, i = self.__getref(pos, True)
+                block[i] = x
+            return
+        stop = max(start, stop)
+        growth = len(items) - (stop - start)
+        if (growth > 0 and self.maxlen is not None
+                and self.length + growth > self.maxlen):
+            raise IndexError("deque already at its maximum size")
+        self.state += 1
+        if growth > 0:
+            self._openslots(stop, growth)
+        elif growth < 0:
+            self._delrange(start + len(items), stop)
+        self._ownslots(self.leftndx + start, self.leftndx + start + len(items))
+        pos = 0
+        for block, first, last in self._ranges(start, start + len(items)):
+            block[first:last] = items[pos:pos+last-first]
+            pos += last - first
 
     def __reduce_ex__(self, proto):
-        return type(self), (list(self), self.maxlen)
+        # The elements go out through a list-items iterator, which pickle
+        # and copy feed back with append()/extend(), instead of as a list
+        # built up front.  This also lets a deque that contains itself be
+        # pickled.
+        return (type(self), self._initargs(), None, self._listitems())
+
+    def _listitems(self):
+        for run in self._runs():
+            for x in run:
+                yield x
+
+    def _runs(self):
+        # the elements, copied out a block at a time
+        state = self.state
+        for block, first, last in self._ranges():
+            yield block[first:last]
+            if self.state != state:
+                raise RuntimeError("deque mutated during iteration")
 
     __hash__ = None
 
     def __copy__(self):
-        return self.__class__(self, self.maxlen)
+        # O(number of blocks): the copy shares the blocks, see _own()
+        copy = self._sibling()
+        copy._freeblock(copy.left)
+        blocks = self.blocks[self.lftblk:]
+        if self._linked:
+            for block in blocks:
+                block[LFTLNK] = block[RGTLNK] = None
+        ids = set(map(id, blocks))
+        if self._shared is None:
+            self._shared = set(ids)
+        else:
+            self._shared |= ids
+        copy._shared = ids
+        copy.blocks = blocks
+        copy.left = blocks[0]
+        copy.right = blocks[-1]
+        copy.leftndx = self.leftndx
+        copy.rightndx = self.rightndx
+        copy.length = self.length
+        return copy
+
+    def snapshot(self):
+        """Return a copy of the deque that shares its blocks.
+
+        Taking a snapshot costs O(number of blocks), not O(len(d)).  A block
+        is copied the first time either deque writes to it, so a snapshot
+        of a queue only ever costs the copy of a block or two at its ends.
+        """
+        return self.__copy__()
+
+    def _ranges(self, start=0, stop=None):
+        # (block, first, last) slot ranges holding the elements start:stop,
+        # left to right; start and stop must already be within 0..len(self)
+        if stop is None:
+            stop = self.length
+        if start >= stop:
+            return
+        n = self._blocksize
+        blocks = self.blocks
+        firstblock, first = divmod(self.leftndx + start, n)
+        lastblock, last = divmod(self.leftndx + stop - 1, n)
+        firstblock += self.lftblk
+        lastblock += self.lftblk
+        for i in range(firstblock, lastblock + 1):
+            yield (blocks[i],
+                   first if i == firstblock else 0,
+                   last + 1 if i == lastblock else n)
+
+    def _mismatch(self, other):
+        # Walk both deques in lockstep, comparing runs of elements that lie
+        # in a single block on both sides.  Returns the first pair of runs
+        # that differ, or None if one deque is a prefix of the other.
+        state, otherstate = self.state, other.state
+        mine, theirs = self._ranges(), other._ranges()
+        a = b = None
+        al = ar = bl = br = 0
+        while True:
+            if al == ar:
+                for a, al, ar in mine:
+                    if al < ar:
+                        break
+                else:
+                    return None
+            if bl == br:
+                for b, bl, br in theirs:
+                    if bl < br:
+                        break
+                else:
+                    return None
+            span = min(ar - al, br - bl)
+            runa = a[al:al+span]
+            runb = b[bl:bl+span]
+            if type(runa) is not type(runb):
+                # blocks of different kinds, e.g. a list and an array
+                runa, runb = list(runa), list(runb)
+            differ = runa != runb
+            if self.state != state or other.state != otherstate:
+                raise RuntimeError("deque mutated during iteration")
+            if differ:
+                return runa, runb
+            al += span
+            bl += span
 
-    # XXX make comparison more efficient
     def __eq__(self, other):
         if isinstance(other, deque):
-            return list(self) == list(other)
+            if self.length != other.length:
+                return False
+            return self._mismatch(other) is None
         else:
             return NotImplemented
 
     def __ne__(self, other):
         if isinstance(other, deque):
-            return list(self) != list(other)
+            if self.length != other.length:
+                return True
+            return self._mismatch(other) is not None
         else:
             return NotImplemented
 
+    # Ordering is lexicographic, as for lists: the first differing runs
+    # decide, otherwise the shorter deque is the smaller one.
+
     def __lt__(self, other):
         if isinstance(other, deque):
-            return list(self) < list(other)
+            runs = self._mismatch(other)
+            if runs is None:
+                return self.length < other.length
+            return runs[0] < runs[1]
         else:
             return NotImplemented
 
     def __le__(self, other):
         if isinstance(other, deque):
-            return list(self) <= list(other)
+            runs = self._mismatch(other)
+            if runs is None:
+                return self.length <= other.length
+            return runs[0] <= runs[1]
         else:
             return NotImplemented
 
     def __gt__(self, other):
         if isinstance(other, deque):
-            return list(self) > list(other)
+            runs = self._mismatch(other)
+            if runs is None:
+                return self.length > other.length
+            return runs[0] > runs[1]
         else:
             return NotImplemented
 
     def __ge__(self, other):
         if isinstance(other, deque):
-            return list(self) >= list(other)
+            runs = self._mismatch(other)
+            if runs is None:
+                return self.length >= other.length
+            return runs[0] >= runs[1]
         else:
             return NotImplemented
 
@@ -373,23 +1236,265 @@ class deque(object):
         self.extend(other)
         return self
 
+    # Concatenation and repetition copy the elements a block slice at a
+    # time, into a copy that shares this deque's blocks.
+
+    def __add__(self, other):
+        if not isinstance(other, deque):
+            return NotImplemented
+        result = self.__copy__()
+        result.extend(other)
+        return result
+
+    def __imul__(self, count):
+        if not isinstance(count, int):
+            return NotImplemented
+        if count <= 0 or not self.length:
+            self.clear()
+            return self
+        if self.maxlen is not None:
+            # only the last maxlen elements survive, and they repeat with
+            # the period of the deque
+            count = min(count, -(-self.maxlen // self.length))
+        source = self.__copy__()
+        for i in range(count - 1):
+            self.extend(source)
+        return self
+
+    def __mul__(self, count):
+        if not isinstance(count, int):
+            return NotImplemented
+        result = self.__copy__()
+        result *= count
+        return result
+
+    __rmul__ = __mul__
+
 class deque_iterator(object):
+    # A cursor over the deque's block directory: _block is the block being
+    # read, _blockndx its index in the directory, _index the next slot to
+    # return and _stop the slot where this block's elements end.  Elements
+    # are read in place, and a mutation is caught by comparing the deque's
+    # state counter on every step.  Once a deque has shared its blocks, item
+    # assignment may replace one with a private copy without changing the
+    # state, so for such a deque the block is looked up in the directory on
+    # every step instead.
 
-    def __init__(self, deq, itergen):
-        self.counter = len(deq)
-        def giveup():
-            self.counter = 0
+    __slots__ = ('_deque', '_state', '_blockndx', '_block', '_index',
+                 '_stop')
+
+    def __init__(self, deq):
+        self._deque = deq
+        self._state = deq.state
+        self._blockndx = deq.lftblk
+        self._block = deq.left
+        self._index = deq.leftndx
+        if deq.left is deq.right:
+            self._stop = deq.rightndx + 1
+        else:
+            self._stop = deq.blocksize
+
+    def __next__(self):
+        deq = self._deque
+        if deq.state != self._state:
             raise RuntimeError("deque mutated during iteration")
-        self._gen = itergen(deq.state, giveup)
+        i = self._index
+        if i < self._stop:
+            self._index = i + 1
+            if deq._shared is None:
+                return self._block[i]
+            return deq.blocks[self._blockndx][i]
+        return self._nextblock()
+
+    next = __next__
+
+    def _nextblock(self):
+        deq = self._deque
+        blocks = deq.blocks
+        if self._blockndx == len(blocks) - 1:
+            raise StopIteration
+        self._blockndx += 1
+        self._block = blocks[self._blockndx]
+        if self._blockndx == len(blocks) - 1:
+            self._stop = deq.rightndx + 1
+        else:
+            self._stop = deq.blocksize
+        self._index = 1
+        return self._block[0]
 
-    def next(self):
-        res = next(self._gen)
-        self.counter -= 1
-        return res
+    def __length_hint__(self):
+        deq = self._deque
+        if deq.state != self._state:
+            return 0
+        pos = (self._blockndx - deq.lftblk) * deq.blocksize + self._index
+        return deq.leftndx + deq.length - pos
 
     def __iter__(self):
         return self
 
+class deque_reverse_iterator(deque_iterator):
+    # The same cursor walking leftwards: _index is the next slot to return
+    # and _stop the slot before the first element of this block.
+
+    __slots__ = ()
+
+    def __init__(self, deq):
+        self._deque = deq
+        self._state = deq.state
+        self._blockndx = len(deq.blocks) - 1
+        self._block = deq.right
+        self._index = deq.rightndx
+        if deq.left is deq.right:
+            self._stop = deq.leftndx - 1
+        else:
+            self._stop = -1
+
+    def __next__(self):
+        deq = self._deque
+        if deq.state != self._state:
+            raise RuntimeError("deque mutated during iteration")
+        i = self._index
+        if i > self._stop:
+            self._index = i - 1
+            if deq._shared is None:
+                return self._block[i]
+            return deq.blocks[self._blockndx][i]
+        return self._nextblock()
+
+    next = __next__
+
+    def _nextblock(self):
+        deq = self._deque
+        if self._blockndx == deq.lftblk:
+            raise StopIteration
+        self._blockndx -= 1
+        self._block = deq.blocks[self._blockndx]
+        if self._blockndx == deq.lftblk:
+            self._stop = deq.leftndx - 1
+        else:
+            self._stop = -1
+        self._index = deq.blocksize - 2
+        return self._block[deq.blocksize - 1]
+
+    def __length_hint__(self):
+        deq = self._deque
+        if deq.state != self._state:
+            return 0
+        pos = (self._blockndx - deq.lftblk) * deq.blocksize + self._index
+        return pos - deq.leftndx + 1
+
+class reversed_deque(object):
+    """A view of a deque with its ends swapped.
+
+    reversed_deque(d) takes O(1) time whatever the length of d.  The view's
+    left end is the right end of d: appending to the view appends to the
+    left of d, popping from it pops from the right of d, and index i of the
+    view is index -1-i of d.  Iterating over the view iterates over d
+    backwards.  Changes through the view are changes to d, and the view
+    sees every change made to d directly.  d.reverse() reverses d itself.
+    """
+
+    __slots__ = ('_deque',)
+
+    def __init__(self, deq):
+        self._deque = deq
+
+    @property
+    def deque(self):
+        return self._deque
+
+    @property
+    def maxlen(self):
+        return self._deque.maxlen
+
+    def __len__(self):
+        return len(self._deque)
+
+    def append(self, x):
+        self._deque.appendleft(x)
+
+    def appendleft(self, x):
+        self._deque.append(x)
+
+    def extend(self, iterable):
+        self._deque.extendleft(iterable)
+
+    def extendleft(self, iterable):
+        self._deque.extend(iterable)
+
+    def pop(self):
+        return self._deque.popleft()
+
+    def popleft(self):
+        return self._deque.pop()
+
+    def rotate(self, n=1):
+        self._deque.rotate(-n)
+
+    def clear(self):
+        self._deque.clear()
+
+    def count(self, value):
+        return self._deque.count(value)
+
+    def __contains__(self, value):
+        return value in self._deque
+
+    def insert(self, index, x):
+        length = len(self._deque)
+        if index < 0:
+            index = max(index + length, 0)
+        elif index > length:
+            index = length
+        self._deque.insert(length - index, x)
+
+    def __iter__(self):
+        return reversed(self._deque)
+
+    def __reversed__(self):
+        return iter(self._deque)
+
+    def _mirror(self, index):
+        # the index or slice of the deque addressing the same elements
+        if not isinstance(index, slice):
+            return -1 - index
+        positions = range(len(self._deque))[index]
+        if not positions:
+            return slice(0, 0)
+        last = len(self._deque) - 1
+        start = last - positions.start
+        stop = last - positions.stop
+        return slice(start, stop if stop >= 0 else None, -positions.step)
+
+    def __getitem__(self, index):
+        return self._deque[self._mirror(index)]
+
+    def __setitem__(self, index, value):
+        if not isinstance(index, slice):
+            self._deque[-1 - index] = value
+            return
+        length = len(self._deque)
+        start, stop, step = index.indices(length)
+        items = list(value)
+        if step == 1:
+            stop = max(start, stop)
+            items.reverse()
+            self._deque[length-stop:length-start] = items
+            return
+        positions = range(start, stop, step)
+        if len(items) != len(positions):
+            raise ValueError("attempt to assign sequence of size %d to "
+                             "extended slice of size %d"
+                             % (len(items), len(positions)))
+        if positions:
+            self._deque[self._mirror(index)] = items
+
+    def __delitem__(self, index):
+        del self._deque[self._mirror(index)]
+
+    def __repr__(self):
+        return 'reversed_deque(%r)' % (self._deque,)
+
 class defaultdict(dict):
     
     def __init__(self, *args, **kwds):
@@ -437,5 +1542,6 @@ class defaultdict(dict):
 
            This API is used by pickle.py and copy.py.
         """
-        return (type(self), (self.default_factory,), None, None, self.iteritems())
+        return (type(self), (self.default_factory,), None, None,
+                iter(self.items()))
 
@@ -0,0 +1,408 @@
+"""Disk-spilling variant of collections_python.deque
+
+spill_deque is a deque for queues that may outgrow memory.  Only its ends
+are hot, so once more than 'maxblocks' blocks are in memory it pickles
+runs of 'pagesize' interior blocks into pages of a temporary file and keeps
+a small handle in the block directory instead.  The pages come back, a
+whole page at a time, when pop(), popleft() or rotate() reach them.  The
+spilled blocks always form a single run in the middle of the deque, with
+at least 'pagesize' resident blocks on either side of it.
+
+len(), maxlen, iteration, indexing and comparisons work as for deque,
+reading spilled pages without bringing them back, and assigning to a single
+index rewrites just the page that holds it.  insert(), remove() and del of
+an index or a slice move the elements on the shorter side of the change, so
+they bring back only the pages between the change and the nearer end.
+reverse() and slice assignment bring every page back first.
+
+Elements must be picklable once the deque spills, and an element that was
+spilled comes back as an unpickled copy rather than the original object.
+"""
+
+import pickle
+import tempfile
+import weakref
+
+from collections_python import deque, n
+
+
+class pagefile(object):
+    """Store of variable-sized byte strings in a temporary file.
+
+    write() returns the offset of a new segment, reusing the first freed
+    segment that is large enough.  The file is only created on the first
+    write, and is emptied by clear(), which the deque calls whenever its
+    last page comes back.  close() closes it, as does dropping the store;
+    a later write() creates a new file.
+    """
+
+    def __init__(self, dir=None):
+        self.dir = dir
+        self._file = None
+        self._close = None  # weakref.finalize closing _file
+        self._end = 0
+        self._free = []     # (offset, size) of freed segments
+
+    def write(self, data):
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(dir=self.dir)
+            self._close = weakref.finalize(self, self._file.close)
+        size = len(data)
+        for i, (offset, room) in enumerate(self._free):
+            if room >= size:
+                if room > size:
+                    self._free[i] = (offset + size, room - size)
+                else:
+                    del self._free[i]
+                break
+        else:
+            offset = self._end
+            self._end += size
+        self._file.seek(offset)
+        self._file.write(data)
+        return offset
+
+    def read(self, offset, size):
+        self._file.seek(offset)
+        return self._file.read(size)
+
+    def free(self, offset, size):
+        self._free.append((offset, size))
+
+    def clear(self):
+        if self._file is not None:
+            self._file.truncate(0)
+        self._end = 0
+        del self._free[:]
+
+    def close(self):
+        if self._file is not None:
+            self._close()
+            self._file = self._close = None
+        self._end = 0
+        del self._free[:]
+
+
+class _page(object):
+    # A spilled run of blocks; each of their directory slots holds
+    # (page, k), k being the block's position within the page.
+
+    __slots__ = ('offset', 'size', 'count')
+
+    def __init__(self, offset, size, count):
+        self.offset = offset
+        self.size = size
+        self.count = count
+
+
+class spill_deque(deque):
+
+    # _spillat is the position of the first spilled block counted from
+    # the left block, and _spilled the number of spilled blocks.  _peeked
+    # caches the last page read without being brought back, as
+    # (page, elements).  _holding is set while a change in the middle runs,
+    # and keeps the blocks it moves from spilling until it is over.
+
+    __slots__ = ('_maxblocks', '_pagesize', '_store', '_spillat', '_spilled',
+                 '_peeked', '_holding')
+
+    # spilled blocks are neither linked nor pooled
+    _linked = False
+
+    def __init__(self, iterable=(), maxlen=None, blocksize=n, maxblocks=1024,
+                 pagesize=16, dir=None):
+        if pagesize < 1:
+            raise ValueError("pagesize must be at least 1")
+        if maxblocks < 4 * pagesize:
+            raise ValueError("maxblocks must be at least 4 * pagesize")
+        self._maxblocks = maxblocks
+        self._pagesize = pagesize
+        self._store = pagefile(dir)
+        self._spillat = self._spilled = 0
+        self._peeked = None
+        self._holding = False
+        super(spill_deque, self).__init__(iterable, maxlen, blocksize)
+
+    @property
+    def maxblocks(self):
+        return self._maxblocks
+
+    @property
+    def pagesize(self):
+        return self._pagesize
+
+    def clear(self):
+        if self._spilled:
+            start = self.lftblk + self._spillat
+            del self.blocks[start:start+self._spilled]
+            self._spilled = 0
+            self._store.clear()
+        self._peeked = None
+        deque.clear(self)
+
+    def close(self):
+        """Remove all elements and close the page file.  The deque can
+        still be used, and makes a new page file if it spills again."""
+        self.clear()
+        self._store.close()
+
+    def _sibling(self):
+        return self.__class__((), self.maxlen, self.blocksize,
+                              self._maxblocks, self._pagesize,
+                              self._store.dir)
+
+    def _blockkind(self):
+        # spliced blocks would bypass the paging bookkeeping
+        return None
+
+    def _linkright(self, newblock):
+        deque._linkright(self, newblock)
+        self._spill()
+
+    def _linkleft(self, newblock):
+        deque._linkleft(self, newblock)
+        if self._spilled:
+            self._spillat += 1
+        self._spill()
+
+    def _unlinkright(self):
+        if self._spilled:
+            total = len(self.blocks) - self.lftblk
+            if self._spillat + self._spilled == total - 1:
+                page = self.blocks[-2][0]
+                self._pagein(total - 1 - page.count)
+        return deque._unlinkright(self)
+
+    def _unlinkleft(self):
+        if self._spilled:
+            if self._spillat == 1:
+                self._pagein(1)
+            self._spillat -= 1
+        return deque._unlinkleft(self)
+
+    # Paging.  A page is taken from the inner end of whichever resident
+    # run is longer than 'pagesize' blocks by a whole page, the right one
+    # first, so a queue that fills on the right spills its newest interior
+    # blocks and brings them back in order as the left end drains.
+
+    def _spill(self):
+        if self._holding:
+            return
+        pagesize = self._pagesize
+        total = len(self.blocks) - self.lftblk
+        while total - self._spilled > self._maxblocks:
+            if not self._spilled:
+                self._spillat = total - pagesize
+            rightrun = total - self._spillat - self._spilled
+            if rightrun - pagesize >= pagesize:
+                start = self._spillat + self._spilled
+            elif self._spillat - pagesize >= pagesize:
+                start = self._spillat = self._spillat - pagesize
+            else:
+                break
+            self._pageout(start)
+            self._spilled += pagesize
+
+    def _pageout(self, start):
+        n = self._blocksize
+        first = self.lftblk + start
+        blocks = self.blocks[first:first+self._pagesize]
+        elements = []
+        for block in blocks:
+            elements.extend(block[:n])
+        data = pickle.dumps(elements, pickle.HIGHEST_PROTOCOL)
+        page = _page(self._store.write(data), len(data), len(blocks))
+        self.blocks[first:first+len(blocks)] = [
+            (page, k) for k in range(len(blocks))]
+        for block in blocks:
+            self._freeblock(block)
+
+    def _pagein(self, start):
+        n = self._blocksize
+        first = self.lftblk + start
+        page = self.blocks[first][0]
+        elements = self._read(page)
+        self._peeked = None
+        blocks = []
+        for k in range(page.count):
+            block = self._newblock()
+            block[:n] = elements[k*n:(k+1)*n]
+            blocks.append(block)
+        self.blocks[first:first+page.count] = blocks
+        self._store.free(page.offset, page.size)
+        if start == self._spillat:
+            self._spillat += page.count
+        self._spilled -= page.count
+        if not self._spilled:
+            self._store.clear()
+
+    def _pageinall(self):
+        while self._spilled:
+            self._pagein(self._spillat)
+
+    def _pagetoward(self, start, stop):
+        # bring back the pages that a change to the elements start:stop
+        # touches: those between it and the end nearer to it, which is the
+        # side deque._openslots() and deque._delrange() move
+        n = self._blocksize
+        if start < self.length - stop:
+            last = (self.leftndx + stop - 1) // n
+            while self._spilled and self._spillat <= last:
+                self._pagein(self._spillat)
+        else:
+            first = (self.leftndx + start) // n
+            while self._spilled and self._spillat + self._spilled > first:
+                end = self.lftblk + self._spillat + self._spilled
+                self._pagein(self._spillat + self._spilled
+                             - self.blocks[end - 1][0].count)
+
+    def _openslots(self, index, count):
+        self._pagetoward(index, index)
+        deque._openslots(self, index, count)
+
+    def _delrange(self, start, stop):
+        if start < stop:
+            self._pagetoward(start, stop)
+        deque._delrange(self, start, stop)
+        self._spill()
+
+    def _rewrite(self, at, i, x):
+        # store x in slot i of the spilled block at directory index 'at' by
+        # writing its page anew; the new page is written before the old one
+        # is freed
+        page, k = self.blocks[at]
+        elements = list(self._read(page))
+        elements[k * self._blocksize + i] = x
+        data = pickle.dumps(elements, pickle.HIGHEST_PROTOCOL)
+        new = _page(self._store.write(data), len(data), page.count)
+        self._store.free(page.offset, page.size)
+        first = at - k
+        self.blocks[first:first+page.count] = [
+            (new, j) for j in range(page.count)]
+        self._peeked = (new, elements)
+
+    def _read(self, page):
+        if self._peeked is not None and self._peeked[0] is page:
+            return self._peeked[1]
+        return pickle.loads(self._store.read(page.offset, page.size))
+
+    def _ranges(self, start=0, stop=None):
+        # a spilled block is read from its page, whose elements stand in
+        # for the block with the slot range shifted to the block's place
+        n = self._blocksize
+        for block, first, last in deque._ranges(self, start, stop):
+            if type(block) is tuple:
+                page, k = block
+                if self._peeked is None or self._peeked[0] is not page:
+                    self._peeked = (page, self._read(page))
+                block = self._peeked[1]
+                first += k * n
+                last += k * n
+            yield block, first, last
+
+    def _iterspilled(self, reverse):
+        state = self.state
+        if reverse:
+            # the element positions where each block starts, so that the
+            # blocks can be read one at a time from the right
+            length = self.length
+            bounds = [0]
+            bounds.extend(range(self._blocksize - self.leftndx, length,
+                                self._blocksize))
+            bounds.append(length)
+            spans = [(bounds[i-1], bounds[i])
+                     for i in range(len(bounds) - 1, 0, -1)]
+        else:
+            spans = [(0, self.length)]
+        for start, stop in spans:
+            for block, first, last in self._ranges(start, stop):
+                run = block[first:last]
+                if reverse:
+                    run.reverse()
+                for x in run:
+                    if self.state != state:
+                        raise RuntimeError("deque mutated during iteration")
+                    yield x
+
+    def __iter__(self):
+        if self._spilled:
+            return self._iterspilled(False)
+        return deque.__iter__(self)
+
+    def __reversed__(self):
+        if self._spilled:
+            return self._iterspilled(True)
+        return deque.__reversed__(self)
+
+    def __getitem__(self, index):
+        if not self._spilled or isinstance(index, slice):
+            return deque.__getitem__(self, index)
+        length = self.length
+        if index < 0:
+            index += length
+        if index < 0 or index >= length:
+            raise IndexError("deque index out of range")
+        for block, first, last in self._ranges(index, index + 1):
+            return block[first]
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            self._setslice(index, value)
+            return
+        if not self._spilled:
+            deque.__setitem__(self, index, value)
+            return
+        length = self.length
+        if index < 0:
+            index += length
+        if index < 0 or index >= length:
+            raise IndexError("deque index out of range")
+        at, i = divmod(self.leftndx + index, self._blocksize)
+        at += self.lftblk
+        if type(self.blocks[at]) is tuple:
+            self._rewrite(at, i, value)
+        else:
+            self.blocks[at][i] = value
+
+    def stats(self):
+        """Return deque.stats() with the number of 'spilled' blocks and
+        the size of the 'pagefile' in bytes added."""
+        stats = deque.stats(self)
+        stats['spilled'] = self._spilled
+        stats['pagefile'] = self._store._end
+        return stats
+
+    def __copy__(self):
+        copy = self._sibling()
+        copy.extend(self)
+        return copy
+
+    def __reduce_ex__(self, proto):
+        return (type(self), ((), self.maxlen, self.blocksize,
+                             self._maxblocks, self._pagesize),
+                None, self._listitems())
+
+
+def _held(name, everything):
+    # run a change that adds blocks while the blocks it moves stay resident,
+    # after bringing back every page if it needs them all
+    method = getattr(deque, name)
+
+    def held(self, *args, **kw):
+        if self._holding:
+            return method(self, *args, **kw)
+        if everything:
+            self._pageinall()
+        self._holding = True
+        try:
+            return method(self, *args, **kw)
+        finally:
+            self._holding = False
+            self._spill()
+    held.__name__ = name
+    held.__doc__ = method.__doc__
+    return held
+
+spill_deque.insert = _held('insert', False)
+spill_deque.reverse = _held('reverse', True)
+spill_deque._setslice = _held('_setslice', True)
@@ -0,0 +1,128 @@
+"""Thread-safe variants of collections_python.deque
+
+locked_deque is a drop-in deque whose every public operation runs under a
+per-instance re-entrant lock, so any mix of threads may share it.
+
+spsc_deque is a cheaper queue for exactly one producer thread, which calls
+append() and extend(), and one consumer thread, which calls popleft().  It
+takes no lock at all: each end is owned by one thread, and an item only
+becomes visible to the consumer once the producer bumps its counter after
+storing it.  This relies on the interpreter running one bytecode at a time
+(the GIL), as the rest of this package does.
+"""
+
+from threading import RLock
+
+from collections_python import deque, freeblocks, n, RGTLNK
+
+
+class locked_deque(deque):
+
+    __slots__ = ('_lock',)
+
+    def __new__(cls, iterable=(), *args, **kw):
+        self = super(locked_deque, cls).__new__(cls, iterable, *args, **kw)
+        self._lock = RLock()
+        return self
+
+    def __init__(self, iterable=(), maxlen=None, blocksize=n):
+        with self._lock:
+            super(locked_deque, self).__init__(iterable, maxlen, blocksize)
+
+    def __reduce_ex__(self, proto):
+        # pickle a snapshot taken under the lock: the streamed elements of
+        # deque.__reduce_ex__ are only read after the lock is released
+        with self._lock:
+            items = list(self)
+        return type(self), self._initargs(), None, iter(items)
+
+    def splice(self, other, left=False):
+        # other is emptied too, so it is locked as well; the two locks are
+        # always taken in the order of their ids so that a.splice(b) and
+        # b.splice(a) running together cannot deadlock
+        locks = [self._lock]
+        if isinstance(other, locked_deque):
+            locks.append(other._lock)
+            locks.sort(key=id)
+        with locks[0], locks[-1]:
+            return deque.splice(self, other, left)
+    splice.__doc__ = deque.splice.__doc__
+
+
+def _locked(name):
+    # the deque method is looked up on every call rather than kept, so
+    # that collections_trace.trace_all() sees these calls too
+    def locked(self, *args, **kw):
+        with self._lock:
+            return getattr(deque, name)(self, *args, **kw)
+    locked.__name__ = name
+    locked.__doc__ = getattr(deque, name).__doc__
+    return locked
+
+for _name in ('append', 'appendleft', 'extend', 'extendleft', 'pop', 'popleft',
+              'popmany', 'popleftmany', 'clear', 'count', '__contains__',
+              'index', 'insert', 'remove', 'rotate', 'reverse', 'stats',
+              '__len__', '__sizeof__', '__getitem__', '__setitem__',
+              '__delitem__', '__iadd__', '__add__', '__mul__', '__rmul__',
+              '__imul__', '__copy__', 'snapshot', '__repr__', '__eq__',
+              '__ne__', '__lt__', '__le__', '__gt__', '__ge__'):
+    setattr(locked_deque, _name, _locked(_name))
+del _name
+
+
+class spsc_deque(object):
+
+    __slots__ = ('left', 'leftndx', 'popped', 'right', 'rightndx', 'pushed',
+                 '_blocksize', '__weakref__')
+
+    def __init__(self, iterable=(), blocksize=n):
+        if blocksize < 1:
+            raise ValueError("blocksize must be at least 1")
+        self._blocksize = blocksize
+        # consumer side
+        self.left = self.right = freeblocks.get(blocksize + 2)
+        self.leftndx = 0
+        self.popped = 0
+        # producer side; rightndx points to the last written element
+        self.rightndx = -1
+        self.pushed = 0
+        self.extend(iterable)
+
+    @property
+    def blocksize(self):
+        return self._blocksize
+
+    def __len__(self):
+        return self.pushed - self.popped
+
+    def append(self, x):
+        rightndx = self.rightndx + 1
+        if rightndx == self._blocksize:
+            # link the new block before publishing anything stored in it
+            newblock = freeblocks.get(self._blocksize + 2)
+            self.right[RGTLNK] = newblock
+            self.right = newblock
+            rightndx = 0
+        self.right[rightndx] = x
+        self.rightndx = rightndx
+        self.pushed += 1
+
+    def extend(self, iterable):
+        for elem in iterable:
+            self.append(elem)
+
+    def popleft(self):
+        if self.popped == self.pushed:
+            raise IndexError("pop from an empty deque")
+        leftndx = self.leftndx
+        if leftndx == self._blocksize:
+            # the producer has moved on past this block, so it is ours
+            block = self.left
+            self.left = block[RGTLNK]
+            freeblocks.put(block)
+            leftndx = 0
+        x = self.left[leftndx]
+        self.left[leftndx] = None
+        self.leftndx = leftndx + 1
+        self.popped += 1
+        return x
@@ -0,0 +1,194 @@
+"""Tracing of collections_python.deque operations
+
+trace(d) starts tracing one deque and trace_all() every deque; both return
+a tracer, whose 'counts' map each traced operation to its number of calls.
+With histograms=True the tracer also keeps a histogram of the time each
+call took.  The traced operations are those in OPERATIONS: append(),
+appendleft(), pop(), popleft(), rotate(), __getitem__() and _newblock(),
+which allocates a block.
+
+Tracing costs nothing while it is off, because nothing checks whether it
+is on: trace(d) moves d to a traced subclass of its class and untrace(d)
+moves it back, and trace_all() puts wrappers on the deque class itself,
+which untrace_all() removes again.  The global tracer counts every deque,
+including the ones that are also traced on their own.
+"""
+
+import weakref
+
+try:
+    from time import perf_counter_ns as _clock
+except ImportError:
+    from time import time
+
+    def _clock():
+        return int(time() * 1e9)
+
+from collections_python import deque
+
+OPERATIONS = ('append', 'appendleft', 'pop', 'popleft', 'rotate',
+              '__getitem__', '_newblock')
+
+
+class tracer(object):
+    """Call counts, and optionally latency histograms, of deque operations.
+
+    'counts' maps each operation to its number of calls.  'histograms' is
+    None unless asked for, and otherwise maps each operation to a list
+    whose item i counts the calls that took from 2**(i-1) up to 2**i
+    nanoseconds.
+    """
+
+    def __init__(self, histograms=False):
+        self.counts = dict.fromkeys(OPERATIONS, 0)
+        if histograms:
+            self.histograms = dict((name, []) for name in OPERATIONS)
+        else:
+            self.histograms = None
+
+    def record(self, name, elapsed):
+        self.counts[name] += 1
+        if self.histograms is not None:
+            bucket = int(elapsed).bit_length()
+            histogram = self.histograms[name]
+            if bucket >= len(histogram):
+                histogram.extend([0] * (bucket + 1 - len(histogram)))
+            histogram[bucket] += 1
+
+    def percentile(self, name, q):
+        """Return an upper bound, in nanoseconds, on the q-th percentile
+        of the time taken by an operation."""
+        histogram = self.histograms[name]
+        rank = q / 100.0 * sum(histogram)
+        seen = 0
+        for bucket, count in enumerate(histogram):
+            seen += count
+            if count and seen >= rank:
+                return 2 ** bucket
+        return 0
+
+    def reset(self):
+        for name in OPERATIONS:
+            self.counts[name] = 0
+            if self.histograms is not None:
+                del self.histograms[name][:]
+
+
+def _wrap(name, method, find, timed):
+    # method(self, ...) runs the operation and find(self) returns the
+    # tracer to report to, or None
+    if timed:
+        def traced(self, *args, **kw):
+            tracer = find(self)
+            if tracer is None:
+                return method(self, *args, **kw)
+            start = _clock()
+            try:
+                return method(self, *args, **kw)
+            finally:
+                tracer.record(name, _clock() - start)
+    else:
+        def traced(self, *args, **kw):
+            tracer = find(self)
+            if tracer is not None:
+                tracer.counts[name] += 1
+            return method(self, *args, **kw)
+    traced.__name__ = name
+    return traced
+
+
+# Per-instance tracing.  The traced subclass only adds methods, so an
+# instance can change class in place; it is made once per class and mode.
+
+_tracers = {}           # id(deque) -> (tracer, finalizer)
+_tracedclasses = {}     # (class, timed) -> traced subclass
+_bases = {}             # traced subclass -> class
+
+
+def _instancetracer(self):
+    entry = _tracers.get(id(self))
+    return entry and entry[0]
+
+
+def _late(base, name):
+    # look the method up on every call, so that trace_all() applies too
+    def method(self, *args, **kw):
+        return getattr(base, name)(self, *args, **kw)
+    return method
+
+
+def _tracedclass(cls, timed):
+    try:
+        return _tracedclasses[cls, timed]
+    except KeyError:
+        pass
+    namespace = {'__slots__': (), '__module__': __name__}
+    for name in OPERATIONS:
+        namespace[name] = _wrap(name, _late(cls, name), _instancetracer,
+                                timed)
+
+    # copies and slices are made with self.__class__; give them the
+    # untraced class, and pickle as that class too
+    def _sibling(self):
+        result = cls._sibling(self)
+        result.__class__ = cls
+        return result
+
+    def __copy__(self):
+        result = cls.__copy__(self)
+        result.__class__ = cls
+        return result
+
+    def __reduce_ex__(self, proto):
+        untraced = lambda x: cls if x is traced else x
+        result = cls.__reduce_ex__(self, proto)
+        return ((untraced(result[0]), tuple(map(untraced, result[1])))
+                + tuple(result[2:]))
+
+    namespace.update(_sibling=_sibling, __copy__=__copy__,
+                     __reduce_ex__=__reduce_ex__)
+    traced = type('traced_' + cls.__name__, (cls,), namespace)
+    _tracedclasses[cls, timed] = traced
+    _bases[traced] = cls
+    return traced
+
+
+def trace(d, histograms=False):
+    """Start tracing the deque d on its own, and return its tracer."""
+    untrace(d)
+    key = id(d)
+    result = tracer(histograms)
+    d.__class__ = _tracedclass(type(d), histograms)
+    _tracers[key] = result, weakref.finalize(d, _tracers.pop, key, None)
+    return result
+
+
+def untrace(d):
+    """Stop tracing the deque d on its own."""
+    entry = _tracers.pop(id(d), None)
+    if entry is not None:
+        entry[1].detach()
+        d.__class__ = _bases[type(d)]
+
+
+# Global tracing
+
+_global = {}            # name -> the deque method the wrapper replaced
+
+
+def trace_all(histograms=False):
+    """Start tracing every deque, and return the global tracer."""
+    untrace_all()
+    result = tracer(histograms)
+    find = lambda self: result
+    for name in OPERATIONS:
+        _global[name] = deque.__dict__[name]
+        setattr(deque, name, _wrap(name, _global[name], find, histograms))
+    return result
+
+
+def untrace_all():
+    """Stop tracing every deque."""
+    for name, method in _global.items():
+        setattr(deque, name, method)
+    _global.clear()
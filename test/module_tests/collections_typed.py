@@ -0,0 +1,158 @@
+"""Typed variant of collections_python.deque
+
+typed_deque holds numbers of a single C type, named by an array.array
+typecode, and keeps them unboxed: each block is an array.array of exactly
+blocksize items, so a deque of floats takes 8 bytes per element instead of
+a list slot plus a float object.  It has the deque API, including maxlen,
+rotate() and slicing.
+
+The data can be read without copying through blockviews(), which yields a
+memoryview of the occupied part of each block, oldest first.  These views
+share memory with the deque and are only meaningful until it is next
+modified.  toarray() and tobytes() make a contiguous copy.
+
+With pickle protocol 5 the blocks are pickled as PickleBuffers, which a
+buffer_callback can send out-of-band without copying them.
+"""
+
+from array import array
+
+try:
+    from pickle import PickleBuffer
+except ImportError:
+    PickleBuffer = None
+
+from collections_python import deque, n
+
+# numeric typecodes only: a blank slot is stored as 0
+TYPECODES = 'bBhHiIlLqQfd'
+
+
+class typed_deque(deque):
+
+    __slots__ = ('_typecode',)
+
+    _vacant = 0
+    _linked = False
+
+    def __new__(cls, typecode, *args, **kw):
+        if typecode not in TYPECODES:
+            raise ValueError("typecode must be one of %r" % (TYPECODES,))
+        self = object.__new__(cls)
+        self._typecode = typecode
+        self._blocksize = n
+        deque.clear(self)
+        return self
+
+    def __init__(self, typecode, iterable=(), maxlen=None, blocksize=n):
+        super(typed_deque, self).__init__(iterable, maxlen, blocksize)
+
+    @property
+    def typecode(self):
+        return self._typecode
+
+    @property
+    def itemsize(self):
+        return array(self._typecode).itemsize
+
+    # Blocks are arrays without link slots.  Unlinked blocks are not
+    # recycled, since a consumer may still hold a view on one.
+
+    def _newblock(self):
+        return array(self._typecode, [0]) * self._blocksize
+
+    def _freeblock(self, block):
+        pass
+
+    def _blanks(self, count):
+        return array(self._typecode, [0]) * count
+
+    def _items(self, iterable):
+        if isinstance(iterable, array) and iterable.typecode == self._typecode:
+            return iterable
+        return array(self._typecode, iterable)
+
+    def _sibling(self):
+        return self.__class__(self._typecode, (), self.maxlen, self.blocksize)
+
+    def _blockkind(self):
+        return (self._typecode, self._blocksize)
+
+    # Values are converted to an array once per bulk operation, or one at a
+    # time for single writes, which also rejects values of the wrong type
+    # before anything is stored.
+
+    def _value(self, x):
+        return array(self._typecode, [x])[0]
+
+    def append(self, x):
+        deque.append(self, self._value(x))
+
+    def appendleft(self, x):
+        deque.appendleft(self, self._value(x))
+
+    def insert(self, index, x):
+        deque.insert(self, index, self._value(x))
+
+    def __setitem__(self, index, value):
+        if not isinstance(index, slice):
+            value = self._value(value)
+        deque.__setitem__(self, index, value)
+
+    def _extendright(self, items):
+        deque._extendright(self, self._items(items))
+
+    def _extendleft(self, items):
+        deque._extendleft(self, self._items(items))
+
+    def extend(self, iterable):
+        if isinstance(iterable, array):
+            self._extendright(iterable)
+        else:
+            deque.extend(self, iterable)
+
+    def extendleft(self, iterable):
+        if isinstance(iterable, array):
+            self._extendleft(iterable)
+        else:
+            deque.extendleft(self, iterable)
+
+    def blockviews(self):
+        """Yield a memoryview of each run of elements, left to right."""
+        for block, first, last in self._ranges():
+            yield memoryview(block)[first:last]
+
+    def toarray(self):
+        """Return the elements as a new array.array."""
+        result = array(self._typecode)
+        for block, first, last in self._ranges():
+            result += block[first:last]
+        return result
+
+    def tobytes(self):
+        """Return the elements in machine representation, as bytes."""
+        return b''.join(self.blockviews())
+
+    def __reduce_ex__(self, proto):
+        if proto >= 5 and PickleBuffer is not None:
+            buffers = [PickleBuffer(view) for view in self.blockviews()]
+            return _frombuffers, (type(self), self._typecode, buffers,
+                                  self.maxlen, self.blocksize)
+        return type(self), (self._typecode, self.toarray(), self.maxlen,
+                            self.blocksize)
+
+    def __repr__(self):
+        if self.maxlen is not None:
+            return 'typed_deque(%r, %r, maxlen=%s)' % (
+                self._typecode, list(self), self.maxlen)
+        return 'typed_deque(%r, %r)' % (self._typecode, list(self))
+
+
+def _frombuffers(cls, typecode, buffers, maxlen, blocksize):
+    # unpickle a typed_deque pickled with protocol 5
+    self = cls(typecode, (), maxlen, blocksize)
+    for buffer in buffers:
+        items = array(typecode)
+        items.frombytes(memoryview(buffer).cast('B'))
+        self.extend(items)
+    return self
@@ -0,0 +1,238 @@
+"""Sliding-window aggregates over collections_python.deque
+
+window_deque is a deque that keeps the sum, minimum and maximum of its
+elements up to date as they come and go, so that a bounded deque used as a
+sliding window can report them on every tick without a pass over the
+window.  sum(), mean(), min() and max() take O(1) time.
+
+The sum is a running total kept with Neumaier's compensation, so that the
+rounding error of a large float does not outstay it in the window: with a
+maxlen of 3, appending 1e16, 1.0, 1.0 and 1.0 leaves a sum of 3.0, not 0.0.
+For ints the compensation stays 0 and the sum is exact.  The minimum and maximum come from monotonic
+chains: for a window that fills on the right and drains on the left
+(append() with a maxlen), each chain holds the elements that are smaller
+(larger) than everything to their right, so its left end is the answer and
+every element joins and leaves a chain at most once.  A window that fills
+on the left keeps the mirror image.  Both directions are amortised O(1);
+taking an element from the end that a chain grows at rebuilds the chains
+in O(n) for the other direction, so that a deque which keeps switching
+direction pays that price on every switch.  Other changes in the middle of
+the deque (insert, remove, rotate, ...) recompute everything.
+"""
+
+import collections
+import operator
+
+from collections_python import deque, n
+
+
+class window_deque(deque):
+
+    # _lo and _hi number the elements: the leftmost has number _lo and the
+    # rightmost _hi - 1.  The chains hold (number, value) pairs.  _comp is
+    # the rounding error lost from _sum so far.
+
+    __slots__ = ('_sum', '_comp', '_mins', '_maxes', '_lo', '_hi', '_rightflow')
+
+    def __init__(self, iterable=(), maxlen=None, blocksize=n):
+        super(window_deque, self).__init__(iterable, maxlen, blocksize)
+
+    def clear(self):
+        deque.clear(self)
+        self._sum = self._comp = 0
+        self._mins = collections.deque()
+        self._maxes = collections.deque()
+        self._lo = self._hi = 0
+        self._rightflow = True
+
+    def _added(self, x):
+        # (_sum, _comp) with x added to the running total
+        total = self._sum + x
+        if abs(self._sum) >= abs(x):
+            return total, self._comp + ((self._sum - total) + x)
+        return total, self._comp + ((x - total) + self._sum)
+
+    def _chains(self):
+        # each chain with the test that lets a new value displace an entry
+        return (self._mins, operator.gt), (self._maxes, operator.lt)
+
+    def append(self, x):
+        # adding and comparing x may raise, so every change is worked out
+        # before any is made: keep is how many entries of a chain stay, or
+        # None if x does not join it
+        total = self._added(x)
+        changes = []
+        for chain, worse in self._chains():
+            keep = len(chain)
+            if self._rightflow:
+                while keep and worse(chain[keep-1][1], x):
+                    keep -= 1
+            elif chain and worse(x, chain[-1][1]):
+                keep = None
+            changes.append((chain, keep))
+        seq = self._hi
+        self._hi += 1
+        self._sum, self._comp = total
+        for chain, keep in changes:
+            if keep is not None:
+                while len(chain) > keep:
+                    chain.pop()
+                chain.append((seq, x))
+        deque.append(self, x)
+
+    def appendleft(self, x):
+        total = self._added(x)
+        changes = []
+        for chain, worse in self._chains():
+            keep = len(chain)
+            if not self._rightflow:
+                while keep and worse(chain[len(chain)-keep][1], x):
+                    keep -= 1
+            elif chain and worse(x, chain[0][1]):
+                keep = None
+            changes.append((chain, keep))
+        self._lo -= 1
+        seq = self._lo
+        self._sum, self._comp = total
+        for chain, keep in changes:
+            if keep is not None:
+                while len(chain) > keep:
+                    chain.popleft()
+                chain.appendleft((seq, x))
+        deque.appendleft(self, x)
+
+    def pop(self):
+        x = deque.pop(self)
+        self._hi -= 1
+        self._sum, self._comp = self._added(-x)
+        if self._rightflow:
+            self._rebuild(False)
+        else:
+            for chain, worse in self._chains():
+                if chain and chain[-1][0] == self._hi:
+                    chain.pop()
+        return x
+
+    def popleft(self):
+        x = deque.popleft(self)
+        seq = self._lo
+        self._lo += 1
+        self._sum, self._comp = self._added(-x)
+        if not self._rightflow:
+            self._rebuild(True)
+        else:
+            for chain, worse in self._chains():
+                if chain and chain[0][0] == seq:
+                    chain.popleft()
+        return x
+
+    def popmany(self, k):
+        items = deque.popmany(self, k)
+        if items:
+            self._hi -= len(items)
+            for x in items:
+                self._sum, self._comp = self._added(-x)
+            if self._rightflow:
+                self._rebuild(False)
+            else:
+                for chain, worse in self._chains():
+                    while chain and chain[-1][0] >= self._hi:
+                        chain.pop()
+        return items
+
+    def popleftmany(self, k):
+        items = deque.popleftmany(self, k)
+        if items:
+            self._lo += len(items)
+            for x in items:
+                self._sum, self._comp = self._added(-x)
+            if not self._rightflow:
+                self._rebuild(True)
+            else:
+                for chain, worse in self._chains():
+                    while chain and chain[0][0] < self._lo:
+                        chain.popleft()
+        return items
+
+    def extend(self, iterable):
+        if iterable is self:
+            iterable = list(iterable)
+        for x in iterable:
+            self.append(x)
+
+    def extendleft(self, iterable):
+        if iterable is self:
+            iterable = list(iterable)
+        for x in iterable:
+            self.appendleft(x)
+
+    def _rebuild(self, rightflow):
+        # rebuild the chains from the elements, for the given direction
+        self._rightflow = rightflow
+        for chain, worse in self._chains():
+            chain.clear()
+            if rightflow:
+                for seq, x in enumerate(self, self._lo):
+                    while chain and worse(chain[-1][1], x):
+                        chain.pop()
+                    chain.append((seq, x))
+            else:
+                numbers = range(self._hi - 1, self._lo - 1, -1)
+                for seq, x in zip(numbers, reversed(self)):
+                    while chain and worse(chain[0][1], x):
+                        chain.popleft()
+                    chain.appendleft((seq, x))
+
+    def _resync(self):
+        self._hi = self._lo + len(self)
+        self._sum = self._comp = 0
+        for x in self:
+            self._sum, self._comp = self._added(x)
+        self._rebuild(self._rightflow)
+
+    def __copy__(self):
+        copy = deque.__copy__(self)
+        copy._sum = self._sum
+        copy._comp = self._comp
+        copy._mins = collections.deque(self._mins)
+        copy._maxes = collections.deque(self._maxes)
+        copy._lo = self._lo
+        copy._hi = self._hi
+        copy._rightflow = self._rightflow
+        return copy
+
+    def sum(self):
+        return self._sum + self._comp
+
+    def mean(self):
+        if not len(self):
+            raise ValueError("mean of an empty deque")
+        return self.sum() / len(self)
+
+    def min(self):
+        if not self._mins:
+            raise ValueError("min of an empty deque")
+        return self._mins[0 if self._rightflow else -1][1]
+
+    def max(self):
+        if not self._maxes:
+            raise ValueError("max of an empty deque")
+        return self._maxes[0 if self._rightflow else -1][1]
+
+
+def _resyncing(name):
+    # the deque method is looked up on every call rather than kept, so
+    # that collections_trace.trace_all() sees these calls too
+    def resyncing(self, *args, **kw):
+        try:
+            return getattr(deque, name)(self, *args, **kw)
+        finally:
+            self._resync()
+    resyncing.__name__ = name
+    resyncing.__doc__ = getattr(deque, name).__doc__
+    return resyncing
+
+for _name in ('insert', 'remove', 'rotate', 'reverse', '__setitem__',
+              '__delitem__', 'splice'):
+    setattr(window_deque, _name, _resyncing(_name))
+del _name
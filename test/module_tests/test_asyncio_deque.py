@@ -0,0 +1,87 @@
+import asyncio
+import unittest
+
+import collections_asyncio
+
+
+class TestAsyncDeque(unittest.IsolatedAsyncioTestCase):
+
+    """ test_pop_waits
+    Testing that pop and popleft suspend on an empty deque
+
+    Purpose: a consumer waiting on an empty deque must be resumed by the
+    next append and receive exactly that item
+    """
+    async def test_pop_waits(self):
+        deque = collections_asyncio.async_deque()
+        right = asyncio.ensure_future(deque.pop())
+        left = asyncio.ensure_future(deque.popleft())
+        await asyncio.sleep(0)
+        self.assertFalse(right.done())
+        await deque.append('a')
+        await deque.appendleft('b')
+        self.assertEqual(await right, 'a')
+        self.assertEqual(await left, 'b')
+        self.assertEqual(len(deque), 0)
+
+    """ test_block_append
+    Testing backpressure of a blocking bounded deque
+
+    Purpose: with block=True, append must wait for room instead of evicting,
+    while the default mode keeps evicting from the other end
+    """
+    async def test_block_append(self):
+        with self.assertRaises(ValueError):
+            collections_asyncio.async_deque(block=True)
+        deque = collections_asyncio.async_deque([1, 2], maxlen=2, block=True)
+        writer = asyncio.ensure_future(deque.append(3))
+        await asyncio.sleep(0)
+        self.assertFalse(writer.done())
+        self.assertEqual(await deque.pop(), 2)
+        await writer
+        self.assertEqual(await deque.pop(), 3)
+        self.assertEqual(await deque.pop(), 1)
+
+        deque = collections_asyncio.async_deque([1, 2], maxlen=2)
+        await deque.append(3)
+        self.assertEqual(await deque.popmany(5), [3, 2])
+
+    """ test_popmany
+    Testing batch pops
+
+    Purpose: popmany must wait for the first item, return at most k items
+    in pop order, and free room for as many blocked writers
+    """
+    async def test_popmany(self):
+        deque = collections_asyncio.async_deque(maxlen=3, block=True)
+        batch = asyncio.ensure_future(deque.popmany(2))
+        await asyncio.sleep(0)
+        writers = [asyncio.ensure_future(deque.append(i)) for i in range(5)]
+        # the first three writers fill the deque before the batch resumes
+        self.assertEqual(await batch, [2, 1])
+        await asyncio.sleep(0)
+        self.assertEqual(len(deque), 3)
+        self.assertEqual(await deque.popmany(2), [4, 3])
+        await asyncio.gather(*writers)
+        self.assertEqual(await deque.popmany(5), [0])
+
+    """ test_cancelled_pop
+    Testing cancellation of a waiting consumer
+
+    Purpose: a cancelled pop must not swallow the wakeup meant for the next
+    consumer, so no item gets stuck in the deque
+    """
+    async def test_cancelled_pop(self):
+        deque = collections_asyncio.async_deque()
+        first = asyncio.ensure_future(deque.pop())
+        second = asyncio.ensure_future(deque.pop())
+        await asyncio.sleep(0)
+        await deque.append('x')
+        first.cancel()
+        self.assertEqual(await second, 'x')
+        with self.assertRaises(asyncio.CancelledError):
+            await first
+
+
+if __name__ == '__main__':
+    unittest.main()
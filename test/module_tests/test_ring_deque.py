@@ -0,0 +1,76 @@
+import collections
+import unittest
+
+import collections_numpy
+from collections_numpy import numpy
+
+
+@unittest.skipIf(numpy is None, "needs NumPy")
+class TestRingDeque(unittest.TestCase):
+
+    """ test_wraparound
+    Testing the circular buffer of ring_deque
+
+    Purpose: appends at both ends and extends past the end of the buffer
+    must keep the same elements, in the same order, as a bounded
+    collections.deque, without ever replacing the buffer
+    """
+    def test_wraparound(self):
+        ring = collections_numpy.ring_deque(maxlen=7)
+        expected = collections.deque(maxlen=7)
+        buffer = ring._data
+        for i in range(20):
+            ring.append(i)
+            expected.append(i)
+            if i % 3 == 0:
+                ring.extend(numpy.arange(i, i + 4))
+                expected.extend(range(i, i + 4))
+            if i % 5 == 0:
+                ring.appendleft(-i)
+                expected.appendleft(-i)
+            self.assertEqual(ring.toarray().tolist(), list(expected))
+        self.assertIs(ring._data, buffer)
+        self.assertEqual(ring.pop(), expected.pop())
+        self.assertEqual(ring.popleft(), expected.popleft())
+        self.assertEqual(ring[-1], expected[-1])
+        ring.extend(range(100))
+        self.assertEqual(ring.toarray().tolist(), list(range(93, 100)))
+
+    """ test_view
+    Testing the ordered view of ring_deque
+
+    Purpose: view() must return the elements in order and share memory
+    with the buffer, also when they wrapped around its end
+    """
+    def test_view(self):
+        ring = collections_numpy.ring_deque(range(10), maxlen=6, dtype=int)
+        view = ring.view()
+        self.assertEqual(view.tolist(), [4, 5, 6, 7, 8, 9])
+        self.assertTrue(numpy.shares_memory(view, ring._data))
+        ring.popleft()
+        ring.append(10)
+        ring.popleft()
+        self.assertEqual(ring.view().tolist(), [6, 7, 8, 9, 10])
+
+    """ test_reductions
+    Testing the window reductions of ring_deque
+
+    Purpose: sum, mean, min, max and percentile must agree with NumPy on
+    the ordered elements, and refuse an empty deque
+    """
+    def test_reductions(self):
+        ring = collections_numpy.ring_deque(maxlen=8)
+        for values in ([3.0, 1.0], [5.0, -2.0, 8.0, 0.5, 4.0], [7.0] * 3):
+            ring.extend(values)
+            window = ring.toarray()
+            self.assertEqual(ring.sum(), window.sum())
+            self.assertAlmostEqual(ring.mean(), window.mean())
+            self.assertEqual(ring.min(), window.min())
+            self.assertEqual(ring.max(), window.max())
+            self.assertEqual(ring.percentile(90),
+                             numpy.percentile(window, 90))
+        ring.clear()
+        with self.assertRaises(ValueError):
+            ring.max()
+        with self.assertRaises(ValueError):
+            collections_numpy.ring_deque()
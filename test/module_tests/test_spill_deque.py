@@ -0,0 +1,153 @@
+import collections
+import gc
+import unittest
+
+import collections_spill
+
+
+def resident(deque):
+    return len(deque.blocks) - deque.lftblk - deque._spilled
+
+
+class TestSpillDeque(unittest.TestCase):
+
+    """ test_queue_spills
+    Testing the paging of a spill_deque used as a queue
+
+    Purpose: a queue growing past maxblocks must keep no more blocks in
+    memory than that, and must give every element back in order, bringing
+    the spilled pages back as the left end reaches them
+    """
+    def test_queue_spills(self):
+        deque = collections_spill.spill_deque(blocksize=4, maxblocks=8,
+                                              pagesize=2)
+        self.addCleanup(deque.close)
+        for i in range(200):
+            deque.append(i)
+            self.assertLessEqual(resident(deque), 8)
+        self.assertGreater(deque._spilled, 0)
+        self.assertEqual(len(deque), 200)
+        out = []
+        for i in range(100):
+            out.append(deque.pop())
+            out.append(deque.popleft())
+            self.assertLessEqual(resident(deque), 8)
+        self.assertEqual(deque._spilled, 0)
+        self.assertEqual(out[::2], list(range(199, 99, -1)))
+        self.assertEqual(out[1::2], list(range(100)))
+
+    """ test_spilled_reads
+    Testing reads of a spilled spill_deque
+
+    Purpose: iteration, reversed iteration, indexing, count, index,
+    slicing and comparison must see the spilled elements without bringing
+    their pages back
+    """
+    def test_spilled_reads(self):
+        deque = collections_spill.spill_deque(range(100), blocksize=3,
+                                              maxblocks=4, pagesize=1)
+        self.addCleanup(deque.close)
+        spilled = deque._spilled
+        self.assertGreater(spilled, 0)
+        self.assertEqual(list(deque), list(range(100)))
+        self.assertEqual(list(reversed(deque)), list(range(99, -1, -1)))
+        self.assertEqual([deque[i] for i in (0, 50, -1)], [0, 50, 99])
+        self.assertEqual(deque.count(42), 1)
+        self.assertEqual(deque.index(77), 77)
+        self.assertEqual(list(deque[10:60:7]), list(range(10, 60, 7)))
+        self.assertEqual(deque, collections_spill.spill_deque(range(100)))
+        self.assertEqual(deque._spilled, spilled)
+
+    """ test_spilled_changes
+    Testing changes to a spilled spill_deque
+
+    Purpose: changes in the middle, rotation and maxlen must give the same
+    elements as collections.deque
+    """
+    def test_spilled_changes(self):
+        deque = collections_spill.spill_deque(range(100), 120, blocksize=3,
+                                              maxblocks=4, pagesize=1)
+        self.addCleanup(deque.close)
+        expected = collections.deque(range(100), 120)
+        for d in (deque, expected):
+            d.rotate(37)
+            d.insert(45, 'x')
+            d.remove(50)
+            del d[20]
+            d[60] = 'y'
+            d.extendleft(range(30))
+            d.rotate(-11)
+        self.assertEqual(list(deque), list(expected))
+        self.assertLessEqual(resident(deque), 4)
+        deque.clear()
+        self.assertEqual((len(deque), deque._spilled), (0, 0))
+
+    """ test_changes_at_the_limit
+    Testing changes in the middle of a spill_deque at its maxblocks limit
+
+    Purpose: insert and slice assignment on a deque that is about to spill
+    must not page blocks out while they are being moved
+    """
+    def test_changes_at_the_limit(self):
+        for index in range(11):
+            deque = collections_spill.spill_deque(range(10), blocksize=3,
+                                                  maxblocks=4, pagesize=1)
+            self.addCleanup(deque.close)
+            expected = list(range(10))
+            deque.insert(index, 'x')
+            expected.insert(index, 'x')
+            self.assertEqual(list(deque), expected)
+            deque[index:index+2] = ['y'] * 5
+            expected[index:index+2] = ['y'] * 5
+            self.assertEqual(list(deque), expected)
+            self.assertLessEqual(resident(deque), 4)
+
+    """ test_changes_page_in_part
+    Testing the pages brought back by changes in the middle of a spill_deque
+
+    Purpose: assigning to a single index must rewrite only the page holding
+    it, and insert, remove and del must bring back only the pages between
+    the change and the nearer end of the deque
+    """
+    def test_changes_page_in_part(self):
+        deque = collections_spill.spill_deque(range(600), blocksize=4,
+                                              maxblocks=8, pagesize=2)
+        self.addCleanup(deque.close)
+        expected = list(range(600))
+        spilled = deque._spilled
+        deque[300] = 'x'
+        expected[300] = 'x'
+        self.assertEqual(deque._spilled, spilled)
+        self.assertEqual(deque[300], 'x')
+        self.assertLessEqual(resident(deque), 8)
+        for change in (lambda d: d.insert(580, 'y'),
+                       lambda d: d.remove(590),
+                       lambda d: d.__delitem__(10),
+                       lambda d: d.__delitem__(slice(20, 30))):
+            change(deque)
+            change(expected)
+            self.assertGreater(deque._spilled, spilled - 8)
+            self.assertLessEqual(resident(deque), 8)
+        self.assertEqual(list(deque), expected)
+
+    """ test_close
+    Testing close() of a spill_deque
+
+    Purpose: close() must empty the deque and close its page file, the
+    deque must still work afterwards, and a deque that is dropped must
+    close its page file too
+    """
+    def test_close(self):
+        deque = collections_spill.spill_deque(range(100), blocksize=3,
+                                              maxblocks=4, pagesize=1)
+        pagefile = deque._store._file
+        deque.close()
+        self.assertTrue(pagefile.closed)
+        self.assertEqual((len(deque), deque._spilled), (0, 0))
+        deque.extend(range(100))
+        self.assertGreater(deque._spilled, 0)
+        self.assertEqual(list(deque), list(range(100)))
+        pagefile = deque._store._file
+        del deque
+        gc.collect()
+        self.assertTrue(pagefile.closed)
@@ -0,0 +1,147 @@
+import sys
+import threading
+import unittest
+
+import collections_threadsafe
+
+
+class TestThreadsafe(unittest.TestCase):
+
+    def setUp(self):
+        # switch threads as often as possible to provoke interleavings
+        self._interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+
+    def tearDown(self):
+        sys.setswitchinterval(self._interval)
+
+    """ test_locked_stress
+    Stress testing of locked_deque shared by several producers and consumers
+
+    Purpose: every item appended by the producers must be popped exactly
+    once by the consumers, and the length must never go out of step
+    """
+    def test_locked_stress(self):
+        deque = collections_threadsafe.locked_deque(blocksize=4)
+        count, producers, consumers = 5000, 3, 3
+        popped = []
+
+        def produce(base):
+            for i in range(count):
+                deque.appendleft(base + i)
+
+        def consume():
+            got = []
+            while len(got) < count:
+                try:
+                    got.append(deque.pop())
+                except IndexError:
+                    pass
+            popped.extend(got)
+
+        threads = [threading.Thread(target=produce, args=(k * count,))
+                   for k in range(producers)]
+        threads += [threading.Thread(target=consume) for k in range(consumers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(popped), list(range(producers * count)))
+        self.assertEqual(len(deque), 0)
+
+    """ test_locked_maxlen
+    Stress testing of locked_deque with a maxlen shared by several writers
+
+    Purpose: the implicit pops done by append must stay atomic with the
+    append, so the deque never exceeds maxlen
+    """
+    def test_locked_maxlen(self):
+        deque = collections_threadsafe.locked_deque(maxlen=10, blocksize=3)
+        lengths = set()
+
+        def produce():
+            for i in range(5000):
+                deque.append(i)
+                deque.appendleft(i)
+                lengths.add(len(deque))
+
+        threads = [threading.Thread(target=produce) for k in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(max(lengths), 10)
+        self.assertEqual(len(deque), 10)
+
+    """ test_locked_splice
+    Stress testing of locked_deque.splice() between deques written by
+    other threads
+
+    Purpose: splicing must hold the lock of the deque it empties, so no
+    item appended to it meanwhile is lost, and splices in both directions
+    at once must not deadlock
+    """
+    def test_locked_splice(self):
+        first = collections_threadsafe.locked_deque(blocksize=4)
+        second = collections_threadsafe.locked_deque(blocksize=4)
+        count = 5000
+        done = []
+
+        def produce(deque, base):
+            try:
+                for i in range(count):
+                    deque.append(base + i)
+            finally:
+                done.append(deque)
+
+        def splice(deque, other):
+            while len(done) < 2:
+                deque.splice(other)
+
+        threads = [threading.Thread(target=produce, args=(first, 0)),
+                   threading.Thread(target=produce, args=(second, count)),
+                   threading.Thread(target=splice, args=(first, second)),
+                   threading.Thread(target=splice, args=(second, first))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(list(first) + list(second)),
+                         list(range(2 * count)))
+
+    """ test_spsc_stress
+    Stress testing of spsc_deque with one producer and one consumer thread
+
+    Purpose: the consumer must see every item exactly once and in order
+    while the producer keeps adding blocks and the consumer frees them
+    """
+    def test_spsc_stress(self):
+        deque = collections_threadsafe.spsc_deque(blocksize=3)
+        count = 20000
+        popped = []
+
+        def produce():
+            for i in range(count):
+                deque.append(i)
+
+        def consume():
+            while len(popped) < count:
+                try:
+                    popped.append(deque.popleft())
+                except IndexError:
+                    pass
+
+        threads = [threading.Thread(target=produce),
+                   threading.Thread(target=consume)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(popped, list(range(count)))
+        self.assertEqual(len(deque), 0)
+        with self.assertRaises(IndexError):
+            deque.popleft()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import copy
+import pickle
+import unittest
+
+import collections_python
+import collections_threadsafe
+import collections_trace
+import collections_window
+
+
+class TestTrace(unittest.TestCase):
+
+    def tearDown(self):
+        collections_trace.untrace_all()
+
+    """ test_trace_instance
+    Testing per-instance tracing of a deque
+
+    Purpose: a traced deque must count its own operations and block
+    allocations, leave other deques alone, and get its class and methods
+    back when tracing stops
+    """
+    def test_trace_instance(self):
+        deque = collections_python.deque(blocksize=4)
+        other = collections_python.deque()
+        tracer = collections_trace.trace(deque)
+        for i in range(10):
+            deque.append(i)
+        other.append(1)
+        deque.popleft()
+        deque.rotate(n=3)
+        deque[2]
+        self.assertEqual(tracer.counts['append'], 10)
+        self.assertEqual(tracer.counts['popleft'], 1)
+        self.assertEqual(tracer.counts['rotate'], 1)
+        self.assertEqual(tracer.counts['__getitem__'], 1)
+        self.assertGreater(tracer.counts['_newblock'], 0)
+        self.assertIsNone(tracer.histograms)
+        self.assertIsInstance(deque, collections_python.deque)
+        self.assertIs(type(copy.copy(deque)), collections_python.deque)
+        self.assertIs(type(deque[1:3]), collections_python.deque)
+        self.assertIs(type(pickle.loads(pickle.dumps(deque))),
+                      collections_python.deque)
+        collections_trace.untrace(deque)
+        self.assertIs(type(deque), collections_python.deque)
+        deque.append(0)
+        self.assertEqual(tracer.counts['append'], 10)
+
+    """ test_trace_all
+    Testing global tracing with latency histograms
+
+    Purpose: trace_all must count the operations of every deque, those of
+    the subclasses included, and time them into histograms, and
+    untrace_all must put the original methods back on the class
+    """
+    def test_trace_all(self):
+        append = collections_python.deque.append
+        tracer = collections_trace.trace_all(histograms=True)
+        for i in range(3):
+            deque = collections_python.deque()
+            deque.append(i)
+            deque.pop()
+        self.assertEqual(tracer.counts['append'], 3)
+        self.assertEqual(sum(tracer.histograms['pop']), 3)
+        locked = collections_threadsafe.locked_deque()
+        locked.append(1)
+        locked.rotate()
+        window = collections_window.window_deque([1, 2])
+        window.rotate()
+        self.assertEqual(tracer.counts['append'], 6)
+        self.assertEqual(tracer.counts['rotate'], 2)
+        self.assertGreater(tracer.percentile('pop', 50), 0)
+        collections_trace.untrace_all()
+        self.assertIs(collections_python.deque.append, append)
+        tracer.reset()
+        self.assertEqual(tracer.counts['append'], 0)
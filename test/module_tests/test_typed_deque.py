@@ -0,0 +1,105 @@
+import array
+import pickle
+import unittest
+
+import collections_python
+import collections_typed
+
+
+class TestTypedDeque(unittest.TestCase):
+
+    """ test_blocks_are_arrays
+    Testing the storage of typed_deque
+
+    Purpose: every block must be an array.array of exactly blocksize items
+    of the deque's typecode, and values of another type must be rejected
+    """
+    def test_blocks_are_arrays(self):
+        deque = collections_typed.typed_deque('d', range(20), blocksize=8)
+        blocks = deque.blocks[deque.lftblk:]
+        self.assertEqual(len(blocks), 4)
+        for block in blocks:
+            self.assertIsInstance(block, array.array)
+            self.assertEqual(block.typecode, 'd')
+            self.assertEqual(len(block), 8)
+        self.assertEqual(list(deque), [float(i) for i in range(20)])
+        expected = list(deque)
+        for write in (deque.append, deque.appendleft,
+                      lambda x: deque.insert(1, x),
+                      lambda x: deque.__setitem__(3, x)):
+            with self.assertRaises(TypeError):
+                write('x')
+            self.assertEqual(len(deque), 20)
+            self.assertEqual(list(deque), expected)
+        with self.assertRaises(TypeError):
+            deque.extend([1.0, 'x'])
+        self.assertEqual(list(deque), expected)
+        small = collections_typed.typed_deque('b', [1])
+        with self.assertRaises(OverflowError):
+            small.append(1000)
+        self.assertEqual(list(small), [1])
+        with self.assertRaises(ValueError):
+            collections_typed.typed_deque('u')
+
+    """ test_deque_api
+    Testing typed_deque against the list-block deque
+
+    Purpose: appends, pops, rotation, maxlen and slicing must leave a
+    typed_deque equal to a collections_python.deque given the same calls
+    """
+    def test_deque_api(self):
+        typed = collections_typed.typed_deque('i', range(50), 40, 7)
+        plain = collections_python.deque(range(50), 40, 7)
+        for deque in (typed, plain):
+            deque.rotate(11)
+            deque.appendleft(-1)
+            deque.extendleft(range(5))
+            deque.rotate(-23)
+            deque.pop()
+            deque.insert(3, 99)
+            del deque[10:20]
+            deque.reverse()
+        self.assertEqual(typed, plain)
+        self.assertEqual(list(typed), list(plain))
+        self.assertEqual(typed.maxlen, 40)
+        self.assertEqual(list(typed[2:30:3]), list(plain[2:30:3]))
+        self.assertIsInstance(typed[:5], collections_typed.typed_deque)
+
+    """ test_buffer_export
+    Testing the zero-copy views of typed_deque
+
+    Purpose: blockviews() must cover the elements in order with views on
+    the blocks themselves, and toarray(), tobytes() and pickling must
+    reproduce the contents
+    """
+    def test_buffer_export(self):
+        deque = collections_typed.typed_deque('q', range(30), blocksize=8)
+        deque.rotate(5)
+        views = list(deque.blockviews())
+        self.assertEqual([v.format for v in views], ['q'] * len(views))
+        self.assertEqual(sum((v.tolist() for v in views), []), list(deque))
+        deque[0] = 1234
+        self.assertEqual(views[0][0], 1234)
+        self.assertEqual(deque.toarray(), array.array('q', deque))
+        self.assertEqual(deque.tobytes(), deque.toarray().tobytes())
+        copy = pickle.loads(pickle.dumps(deque))
+        self.assertEqual(copy, deque)
+        self.assertEqual(copy.typecode, 'q')
+
+    """ test_pickle_buffers
+    Testing protocol 5 pickling of typed_deque
+
+    Purpose: with a buffer_callback every block must go out of band without
+    copying, and the deque must come back with the same contents, maxlen
+    and blocksize, out of band or in band
+    """
+    def test_pickle_buffers(self):
+        deque = collections_typed.typed_deque('d', range(40), 50, 8)
+        buffers = []
+        data = pickle.dumps(deque, 5, buffer_callback=buffers.append)
+        self.assertEqual(len(buffers), len(list(deque.blockviews())))
+        self.assertLess(len(data), 200)
+        copy = pickle.loads(data, buffers=buffers)
+        self.assertEqual(copy, deque)
+        self.assertEqual((copy.maxlen, copy.blocksize), (50, 8))
+        self.assertEqual(pickle.loads(pickle.dumps(deque, 5)), deque)
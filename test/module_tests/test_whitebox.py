@@ -1,7 +1,12 @@
 
 
+import copy
+import gc
 import unittest
+import operator
+import pickle
 import sys
+import weakref
 
 #set local path here
 PATH = "" + "/test/module_tests"
@@ -10,6 +15,10 @@ sys.path.append(PATH)
 import collections_python
 
 
+class plain_deque(collections_python.deque):
+    # a subclass with the (iterable, maxlen) signature of CPython's deque
+    def __init__(self, iterable=(), maxlen=None):
+        super(plain_deque, self).__init__(iterable, maxlen)
 
 
 class TestWhitebox(unittest.TestCase):
@@ -51,7 +60,619 @@ class TestWhitebox(unittest.TestCase):
 
         #path [1, 3, 7] tested already
 
+    """ test_getitem_block_directory
+    Whitebox testing of deque indexing through the block directory
 
+    Purpose: indexing must find the right block and slot for positive and
+    negative indices while blocks are added and dropped at both ends
+    """
+    def test_getitem_block_directory(self):
+        deque = collections_python.deque()
+        n = 10 * collections_python.n
+        for i in range(n):
+            deque.append(i)
+            deque.appendleft(-i - 1)
+        for i in range(n):
+            deque.pop()
+        for i in range(len(deque)):
+            self.assertEqual(deque[i], i - n)
+            self.assertEqual(deque[-i - 1], -i - 1)
+        deque[3] = 'x'
+        deque[-1] = 'y'
+        self.assertEqual(deque[3], 'x')
+        self.assertEqual(deque[n - 1], 'y')
+        with self.assertRaises(IndexError):
+            deque[n]
+        with self.assertRaises(IndexError):
+            deque[-n - 1]
+        del deque[1]
+        self.assertEqual(deque[1], 2 - n)
+        self.assertEqual(len(deque), n - 1)
+
+    """ test_rotate_blocks
+    Whitebox testing of deque rotate over several blocks
+
+    Purpose: rotating by more than a block must give the same order as
+    rotating one step at a time, both when the blocks line up and get
+    relinked and when partial block slices are copied
+    """
+    def test_rotate_blocks(self):
+        n = collections_python.n
+        for length in (6 * n, 6 * n + 7):
+            for steps in (1, n, 3 * n, -2 * n - 5, length + 4):
+                deque = collections_python.deque()
+                for i in range(length):
+                    deque.append(i)
+                deque.rotate(steps)
+                shift = steps % length
+                for i in range(length):
+                    self.assertEqual(deque[i], (i - shift) % length)
+        deque = collections_python.deque()
+        for i in range(6 * n):
+            deque.append(i)
+        blocks = set(map(id, deque.blocks[deque.lftblk:]))
+        deque.rotate(3 * n)
+        self.assertEqual(set(map(id, deque.blocks[deque.lftblk:])), blocks)
+
+    """ test_extend_bulk
+    Whitebox testing of deque extend and extendleft filling whole blocks
+
+    Purpose: lists, tuples and plain iterators spanning several blocks must
+    end up in the same order as repeated append/appendleft calls, the
+    maxlen limit must be applied from the opposite end, and the items an
+    iterator gave before raising must be kept
+    """
+    def test_extend_bulk(self):
+        n = collections_python.n
+        items = list(range(5 * n + 3))
+        for kind in (list, tuple, iter):
+            deque = collections_python.deque(kind(items))
+            deque.extendleft(kind(items))
+            deque.extend(kind(items))
+            self.assertEqual(len(deque), 3 * len(items))
+            expected = items[::-1] + items + items
+            for i in range(len(deque)):
+                self.assertEqual(deque[i], expected[i])
+
+            deque = collections_python.deque(kind(items), maxlen=n + 1)
+            self.assertEqual(len(deque), n + 1)
+            self.assertEqual(deque[0], items[-n - 1])
+            deque.extendleft(kind(items[:2]))
+            self.assertEqual(deque[0], 1)
+            self.assertEqual(deque[-1], items[-3])
+            deque = collections_python.deque(kind(items), maxlen=0)
+            self.assertEqual(len(deque), 0)
+
+        def failing():
+            for x in items:
+                yield x
+            raise KeyError(x)
+        deque = collections_python.deque()
+        self.assertRaises(KeyError, deque.extend, failing())
+        self.assertEqual(list(deque), items)
+        self.assertRaises(KeyError, deque.extendleft, failing())
+        self.assertEqual(list(deque), items[::-1] + items)
+
+    """ test_block_pool
+    Whitebox testing of the block free-list shared by all deques
+
+    Purpose: a deque crossing a block boundary back and forth and a cleared
+    deque must recycle pooled blocks instead of allocating new ones, and
+    recycled blocks must come back empty
+    """
+    def test_block_pool(self):
+        pool = collections_python.freeblocks
+        n = collections_python.n
+        deque = collections_python.deque()
+        for i in range(n // 2 - 1):
+            deque.append(i)
+        misses = pool.misses
+        for i in range(100):
+            deque.append(i)
+            deque.append(i)
+            deque.pop()
+            deque.pop()
+        self.assertLessEqual(pool.misses, misses + 1)
+
+        deque.extend(range(10 * n))
+        deque.clear()
+        self.assertGreater(len(pool), 0)
+        hits = pool.hits
+        deque.extend(range(3 * n))
+        self.assertGreater(pool.hits, hits)
+        for block in pool._free[collections_python.BLOCKSIZ]:
+            self.assertEqual(block, [None] * collections_python.BLOCKSIZ)
+
+    """ test_blocksize
+    Whitebox testing of the per-instance block size
+
+    Purpose: deques with small and large blocks must keep the same order
+    through appends, pops, indexing, rotation and reversal, every block must
+    have the requested size, and too small block sizes must be rejected
+    """
+    def test_blocksize(self):
+        with self.assertRaises(ValueError):
+            collections_python.deque(blocksize=2)
+        items = list(range(200))
+        for blocksize in (3, 7, 64, 500):
+            deque = collections_python.deque(items, blocksize=blocksize)
+            self.assertEqual(deque.blocksize, blocksize)
+            deque.appendleft(-1)
+            deque.rotate(45)
+            deque.rotate(-45)
+            deque.reverse()
+            deque.reverse()
+            self.assertEqual(deque.pop(), 199)
+            self.assertEqual(deque.popleft(), -1)
+            for i in range(len(deque)):
+                self.assertEqual(deque[i], i)
+            for block in deque.blocks[deque.lftblk:]:
+                self.assertEqual(len(block), blocksize + 2)
+
+    """ test_slots
+    Whitebox testing of the __slots__ layout of deque
+
+    Purpose: a deque must not carry a per-instance __dict__, while subclasses
+    can still add their own attributes and deques can be weakly referenced
+    """
+    def test_slots(self):
+        deque = collections_python.deque([1, 2, 3])
+        self.assertFalse(hasattr(deque, '__dict__'))
+        with self.assertRaises(AttributeError):
+            deque.tag = 'x'
+
+        class tagged(collections_python.deque):
+            pass
+        deque = tagged([1, 2, 3], maxlen=2)
+        deque.tag = 'x'
+        self.assertEqual(deque.tag, 'x')
+        self.assertEqual(deque[0], 2)
+        self.assertIs(weakref.ref(deque)(), deque)
+
+        deque = plain_deque(range(10), 8)
+        for result in (copy.copy(deque), pickle.loads(pickle.dumps(deque)),
+                       deque[2:], deque + deque):
+            self.assertIs(type(result), plain_deque)
+            self.assertEqual(result.maxlen, 8)
+        self.assertEqual(list(copy.copy(deque)), list(range(2, 10)))
+        self.assertEqual(list(deque + deque), list(range(2, 10)))
+
+    """ test_compare_blocks
+    Whitebox testing of the block-by-block deque comparisons
+
+    Purpose: comparing deques whose blocks are laid out differently must give
+    the same results as comparing the equivalent lists, and an element
+    comparison that mutates a deque must be detected
+    """
+    def test_compare_blocks(self):
+        base = list(range(100))
+        lists = [base, base[:-1], base[:50] + [-1] + base[51:], [], [0]]
+        for a in lists:
+            for b in lists:
+                left = collections_python.deque(a, blocksize=4)
+                right = collections_python.deque(blocksize=30)
+                right.extendleft(reversed(b))
+                self.assertEqual(left == right, a == b)
+                self.assertEqual(left != right, a != b)
+                self.assertEqual(left < right, a < b)
+                self.assertEqual(left <= right, a <= b)
+                self.assertEqual(left > right, a > b)
+                self.assertEqual(left >= right, a >= b)
+
+        class mutator(object):
+            def __eq__(self, other):
+                deque.append(None)
+                return False
+        deque = collections_python.deque([mutator()])
+        with self.assertRaises(RuntimeError):
+            deque == collections_python.deque([0])
+
+    """ test_delete_shift
+    Whitebox testing of deletion by shifting the shorter side of a deque
+
+    Purpose: deleting and removing at every position of a multi-block deque
+    must keep the order of the other elements, and a comparison that mutates
+    the deque during remove must be detected
+    """
+    def test_delete_shift(self):
+        items = list(range(40))
+        for index in range(-len(items), len(items)):
+            deque = collections_python.deque(items, blocksize=3)
+            del deque[index]
+            expected = items[:]
+            del expected[index]
+            self.assertEqual(len(deque), len(expected))
+            for i in range(len(expected)):
+                self.assertEqual(deque[i], expected[i])
+        deque = collections_python.deque(items + items, blocksize=4)
+        deque.remove(39)
+        deque.remove(0)
+        self.assertEqual(deque[0], 1)
+        self.assertEqual(deque[38], 0)
+        self.assertEqual(deque[-1], 39)
+        with self.assertRaises(ValueError):
+            deque.remove(-1)
+
+        class mutator(object):
+            def __eq__(self, other):
+                deque.appendleft(None)
+                return False
+        deque = collections_python.deque([mutator(), 1])
+        with self.assertRaises(IndexError):
+            deque.remove(1)
+
+    """ test_insert_index
+    Whitebox testing of deque insert and index over several blocks
+
+    Purpose: insert must place the element at the requested position from
+    either half of the deque and respect maxlen, and index must honour its
+    start and stop bounds like list.index
+    """
+    def test_insert_index(self):
+        items = list(range(30))
+        for index in range(-35, 35):
+            deque = collections_python.deque(items, blocksize=4)
+            deque.insert(index, 'x')
+            expected = items[:]
+            expected.insert(index, 'x')
+            self.assertEqual(len(deque), len(expected))
+            for i in range(len(expected)):
+                self.assertEqual(deque[i], expected[i])
+                self.assertEqual(deque.index(expected[i]), i)
+        deque = collections_python.deque(items + items, blocksize=4)
+        self.assertEqual(deque.index(5, 6), 35)
+        self.assertEqual(deque.index(5, -30), 35)
+        with self.assertRaises(ValueError):
+            deque.index(5, 6, 35)
+        with self.assertRaises(ValueError):
+            deque.index('x')
+        deque = collections_python.deque([1, 2], maxlen=2)
+        with self.assertRaises(IndexError):
+            deque.insert(1, 3)
+
+    """ test_iterator_cursor
+    Whitebox testing of the block cursor deque iterators
+
+    Purpose: forward and reverse iteration must visit every block in order
+    and report the remaining length, and a mutation of the deque must stop
+    the iterator with RuntimeError
+    """
+    def test_iterator_cursor(self):
+        items = list(range(50))
+        deque = collections_python.deque(items, blocksize=4)
+        deque.rotate(7)
+        deque.rotate(-7)
+        self.assertEqual(list(deque), items)
+        self.assertEqual(list(reversed(deque)), items[::-1])
+        self.assertEqual(list(collections_python.deque()), [])
+
+        iterator = iter(deque)
+        backwards = reversed(deque)
+        for i in range(10):
+            next(iterator)
+            next(backwards)
+        self.assertEqual(operator.length_hint(iterator), 40)
+        self.assertEqual(operator.length_hint(backwards), 40)
+        self.assertEqual(next(iterator), 10)
+        self.assertEqual(next(backwards), 39)
+        deque.append(50)
+        self.assertEqual(operator.length_hint(iterator), 0)
+        with self.assertRaises(RuntimeError):
+            next(iterator)
+        with self.assertRaises(RuntimeError):
+            next(backwards)
+
+
+    """
+    Whitebox testing of deque slicing
+
+    Purpose: getting, setting and deleting slices, extended ones included,
+    must give the same result as on a list, across block boundaries
+    """
+    def test_slices(self):
+        items = list(range(20))
+        slices = [slice(None), slice(2, 15), slice(-7, None), slice(15, 2),
+                  slice(1, None, 3), slice(None, None, -1),
+                  slice(17, 2, -4), slice(5, 5)]
+        for s in slices:
+            d = collections_python.deque(items, blocksize=4)
+            self.assertIsInstance(d[s], collections_python.deque)
+            self.assertEqual(list(d[s]), items[s])
+            for new in ([], ['a'], ['a'] * 9):
+                d = collections_python.deque(items, blocksize=4)
+                l = list(items)
+                if s.step is not None:
+                    new = ['b'] * len(l[s])
+                d[s] = new
+                l[s] = new
+                self.assertEqual(list(d), l)
+            d = collections_python.deque(items, blocksize=4)
+            l = list(items)
+            del d[s]
+            del l[s]
+            self.assertEqual(list(d), l)
+        d = collections_python.deque(items, maxlen=20)
+        with self.assertRaises(IndexError):
+            d[3:4] = 'ab'
+        with self.assertRaises(ValueError):
+            d[::2] = 'ab'
+        self.assertEqual(d[:3].maxlen, 20)
+
+    """
+    Whitebox testing of deque and defaultdict pickling
+
+    Purpose: a deque must pickle its elements through a list-items iterator
+    rather than a list argument, keep its maxlen and blocksize, and survive
+    containing itself; a defaultdict must round-trip with its factory
+    """
+    def test_pickle_stream(self):
+        deque = collections_python.deque(range(50), 60, 7)
+        reduced = deque.__reduce_ex__(2)
+        self.assertEqual(reduced[1], ((), 60, 7))
+        self.assertEqual(list(reduced[3]), list(range(50)))
+        deque.append(deque)
+        for proto in range(pickle.HIGHEST_PROTOCOL + 1):
+            copy = pickle.loads(pickle.dumps(deque, proto))
+            self.assertIs(copy[-1], copy)
+            self.assertEqual(list(copy)[:-1], list(range(50)))
+            self.assertEqual((copy.maxlen, copy.blocksize), (60, 7))
+        counts = collections_python.defaultdict(int, a=1)
+        counts['b'] += 2
+        copy = pickle.loads(pickle.dumps(counts))
+        self.assertEqual(copy, {'a': 1, 'b': 2})
+        self.assertIs(copy.default_factory, int)
+
+    """
+    Whitebox testing of deque memory accounting
+
+    Purpose: sys.getsizeof must count every block and the directory, and
+    stats() must report the blocks, their occupancy and the unused slots
+    at each end, and count clear() as a change that stops iterators
+    """
+    def test_memory_stats(self):
+        deque = collections_python.deque(range(20), blocksize=8)
+        blocks = deque.blocks[deque.lftblk:]
+        expected = (object.__sizeof__(deque) + sys.getsizeof(deque.blocks)
+                    + sum(sys.getsizeof(block) for block in blocks))
+        self.assertEqual(deque.__sizeof__(), expected)
+        self.assertGreaterEqual(sys.getsizeof(deque), expected)
+        stats = deque.stats()
+        self.assertEqual(stats['blocks'], 4)
+        self.assertEqual(stats['slots'], 32)
+        self.assertEqual(stats['length'], 20)
+        self.assertEqual(stats['occupancy'], 20 / 32.0)
+        self.assertEqual(stats['leftfree'], deque.leftndx)
+        self.assertEqual(stats['rightfree'], 7 - deque.rightndx)
+        self.assertEqual(stats['leftfree'] + stats['rightfree'], 12)
+        mutations = stats['mutations']
+        iterator = iter(deque)
+        next(iterator)
+        deque.clear()
+        deque.extend(range(5))
+        self.assertEqual(deque.stats()['mutations'], mutations + 2)
+        self.assertRaises(RuntimeError, next, iterator)
+
+    """
+    Whitebox testing of the block scans in count() and "in"
+
+    Purpose: count() and membership must scan every block, see equal as
+    well as identical elements, and raise RuntimeError when a comparison
+    changes the deque
+    """
+    def test_count_contains(self):
+        items = [i % 7 for i in range(100)]
+        deque = collections_python.deque(items, blocksize=8)
+        for x in range(8):
+            self.assertEqual(deque.count(x), items.count(x))
+        self.assertIn(6, deque)
+        self.assertIn(6.0, deque)
+        self.assertNotIn(7, deque)
+        nan = float('nan')
+        deque.append(nan)
+        self.assertIn(nan, deque)
+        self.assertEqual(deque.count(nan), 1)
+
+        class Mutating(object):
+            def __eq__(self, other):
+                deque.append(0)
+                return False
+        self.assertRaises(RuntimeError, deque.count, Mutating())
+        self.assertRaises(RuntimeError, operator.contains, deque, Mutating())
+
+    """
+    Whitebox testing of copy-on-write block sharing
+
+    Purpose: a copy must start out sharing every block, a write on either
+    side must copy only the block it touches, popping from a shared block
+    must not copy it, and a shared block must never reach the block pool
+    """
+    def test_copy_on_write(self):
+        deque = collections_python.deque(range(40), blocksize=8)
+        blocks = deque.blocks[deque.lftblk:]
+        snapshot = deque.snapshot()
+        self.assertEqual(len(snapshot.blocks), len(blocks))
+        for mine, theirs in zip(blocks, snapshot.blocks):
+            self.assertIs(mine, theirs)
+        self.assertEqual(snapshot.stats()['shared'], len(blocks))
+        deque[20] = 'x'
+        self.assertEqual(snapshot[20], 20)
+        changed = [i for i, block in enumerate(deque.blocks[deque.lftblk:])
+                   if block is not blocks[i]]
+        self.assertEqual(changed, [(deque.leftndx + 20) // 8])
+        deque.append(40)
+        self.assertEqual(len(snapshot), 40)
+        self.assertIs(snapshot.blocks[0], deque.left)
+        pool = collections_python.freeblocks
+        spare = len(pool)
+        for i in range(8):
+            self.assertEqual(deque.popleft(), i)
+        self.assertIs(snapshot.blocks[0], blocks[0])
+        self.assertEqual(list(snapshot), list(range(40)))
+        self.assertEqual(len(pool), spare)
+        copy = pickle.loads(pickle.dumps(snapshot))
+        self.assertEqual(list(copy), list(range(40)))
+        snapshot.reverse()
+        self.assertEqual(list(deque), list(range(8, 20)) + ['x']
+                         + list(range(21, 41)))
+        self.assertEqual(list(reversed(snapshot)), list(range(40)))
+
+    """
+    Whitebox testing of the block-level reverse and the reversed view
+
+    Purpose: reverse() must reverse the block directory and the slots of
+    each block, keeping the elements packed at the new ends, and a
+    reversed_deque must map its operations onto the other end of the deque
+    """
+    def test_reverse_blocks(self):
+        for length in range(20):
+            deque = collections_python.deque(range(length), blocksize=4)
+            blocks = deque.blocks[deque.lftblk:]
+            deque.reverse()
+            self.assertEqual(list(deque), list(range(length))[::-1])
+            self.assertEqual(deque.blocks[deque.lftblk:], blocks[::-1])
+            self.assertEqual(deque.leftndx + length,
+                             4 * (len(blocks) - 1) + deque.rightndx + 1)
+            deque.append('x')
+            deque.appendleft('y')
+            self.assertEqual(list(deque),
+                             ['y'] + list(range(length))[::-1] + ['x'])
+        deque = collections_python.deque(range(10), blocksize=4)
+        view = collections_python.reversed_deque(deque)
+        self.assertEqual(list(view), list(range(10))[::-1])
+        self.assertEqual(view[0], 9)
+        self.assertEqual(list(view[1:4]), [8, 7, 6])
+        view.append('x')
+        self.assertEqual(deque[0], 'x')
+        self.assertEqual(view.popleft(), 9)
+        view[0] = 'y'
+        self.assertEqual(deque[-1], 'y')
+        del view[1:3]
+        self.assertEqual(list(deque), ['x'] + list(range(6)) + ['y'])
+
+    """
+    Whitebox testing of splice(), concatenation and repetition
+
+    Purpose: splice() must move the other deque's blocks rather than its
+    elements, leave it empty and keep every interior block full whatever
+    the alignment of the two deques, and +, += and * must match lists
+    """
+    def test_splice(self):
+        for offset in range(4):
+            deque = collections_python.deque(range(10), blocksize=4)
+            other = collections_python.deque(range(offset), blocksize=4)
+            other.extend(range(100, 112))
+            for i in range(offset):
+                other.popleft()
+            middle = other.blocks[other.lftblk + 2]
+            deque.splice(other)
+            self.assertTrue(any(block is middle for block in deque.blocks))
+            self.assertEqual(len(other), 0)
+            self.assertEqual(list(other), [])
+            expected = list(range(10)) + list(range(100, 112))
+            self.assertEqual(list(deque), expected)
+            self.assertEqual([deque[i] for i in range(22)], expected)
+            other.splice(deque, left=True)
+            self.assertEqual(list(other), expected)
+            other.appendleft('x')
+            self.assertEqual(other[0], 'x')
+        deque = collections_python.deque('abc', maxlen=4)
+        deque.splice(collections_python.deque('xyz'))
+        self.assertEqual(list(deque), list('cxyz'))
+        self.assertRaises(ValueError, deque.splice, deque)
+        self.assertRaises(TypeError, deque.splice, [1])
+        deque = collections_python.deque(range(5), blocksize=3)
+        self.assertEqual(list(deque + deque), list(range(5)) * 2)
+        self.assertEqual(list(deque * 3), list(range(5)) * 3)
+        self.assertEqual(list(2 * deque), list(range(5)) * 2)
+        self.assertEqual(list(deque * 0), [])
+        deque += deque
+        self.assertEqual(list(deque), list(range(5)) * 2)
+        bounded = collections_python.deque(range(5), maxlen=7)
+        bounded *= 10 ** 9
+        self.assertEqual(list(bounded), [3, 4, 0, 1, 2, 3, 4])
+        with self.assertRaises(TypeError):
+            deque + [1]
+
+    """
+    Whitebox testing of the batch pops
+
+    Purpose: popmany() and popleftmany() must return up to k elements in
+    pop order, give the emptied blocks back at once and count as a single
+    change, and drain() must hand over every element in bounded batches
+    """
+    def test_batch_pops(self):
+        deque = collections_python.deque(range(50), blocksize=4)
+        blocks = len(deque.blocks) - deque.lftblk
+        state = deque.state
+        self.assertEqual(deque.popleftmany(10), list(range(10)))
+        self.assertEqual(deque.state, state + 1)
+        self.assertEqual(len(deque.blocks) - deque.lftblk, blocks - 3)
+        self.assertEqual(deque.popmany(5), [49, 48, 47, 46, 45])
+        self.assertEqual(deque[0], 10)
+        self.assertEqual(deque[-1], 44)
+        self.assertEqual(deque.popmany(0), [])
+        batches = []
+        self.assertEqual(deque.drain(batches.append, 8), 35)
+        self.assertEqual([len(batch) for batch in batches], [8] * 4 + [3])
+        self.assertEqual(sum(batches, []), list(range(10, 45)))
+        self.assertEqual(deque.popleftmany(3), [])
+        self.assertRaises(ValueError, deque.drain, batches.append, 0)
+        deque.append(1)
+        self.assertEqual(list(deque), [1])
+
+    """
+    Whitebox testing of iteration over a deque with a live snapshot
+
+    Purpose: assigning an element during iteration copies the shared block
+    without changing the state, so the iterators must read the new private
+    block rather than the one they started on
+    """
+    def test_iterate_while_unsharing(self):
+        deque = collections_python.deque(range(10), blocksize=4)
+        snapshot = deque.snapshot()
+        it = iter(deque)
+        self.assertEqual([next(it), next(it)], [0, 1])
+        deque[2] = 'x'
+        deque[6] = 'y'
+        self.assertEqual(list(it), ['x', 3, 4, 5, 'y', 7, 8, 9])
+        self.assertEqual(list(snapshot), list(range(10)))
+        deque = snapshot.snapshot()
+        it = reversed(snapshot)
+        self.assertEqual([next(it), next(it)], [9, 8])
+        snapshot[7] = 'z'
+        snapshot[3] = 'w'
+        self.assertEqual(list(it), ['z', 6, 5, 4, 'w', 2, 1, 0])
+        self.assertEqual(list(deque), list(range(10)))
+        deque = collections_python.deque(range(10), blocksize=4)
+        it = iter(deque)
+        self.assertEqual([next(it), next(it)], [0, 1])
+        snapshot = deque.snapshot()
+        deque[2] = 'x'
+        self.assertEqual(list(it), ['x', 3, 4, 5, 6, 7, 8, 9])
+        self.assertEqual(list(snapshot), list(range(10)))
+
+    """
+    Whitebox testing of the links of blocks that have been shared
+
+    Purpose: after a snapshot, the blocks a queue pops must not stay
+    reachable through the links of the blocks still in it, or the popped
+    elements a shared block keeps would never be freed
+    """
+    def test_shared_links_released(self):
+        class element(object):
+            pass
+        items = [element() for i in range(60)]
+        refs = [weakref.ref(item) for item in items]
+        deque = collections_python.deque(items, blocksize=4)
+        del items
+        deque.snapshot()
+        for i in range(45):
+            deque.popleft()
+        gc.collect()
+        self.assertEqual([ref() is None for ref in refs],
+                         [True] * 45 + [False] * 15)
+        for block in deque.blocks[deque.lftblk:]:
+            self.assertEqual(block[-2:], [None, None])
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,132 @@
+import math
+import random
+import unittest
+
+import collections_window
+
+
+class TestWindowDeque(unittest.TestCase):
+
+    def check(self, window):
+        values = list(window)
+        self.assertEqual(window.sum(), sum(values))
+        self.assertEqual(window.min(), min(values))
+        self.assertEqual(window.max(), max(values))
+
+    """ test_sliding_window
+    Testing the aggregates of a bounded window_deque
+
+    Purpose: sum, min and max must follow the window as appends evict the
+    oldest elements, in either direction, and the chains must stay no
+    longer than the window
+    """
+    def test_sliding_window(self):
+        rng = random.Random(1)
+        right = collections_window.window_deque(maxlen=10, blocksize=4)
+        left = collections_window.window_deque(maxlen=10, blocksize=4)
+        for i in range(200):
+            x = rng.randint(-100, 100)
+            right.append(x)
+            left.appendleft(x)
+            self.check(right)
+            self.check(left)
+            self.assertLessEqual(len(right._mins), 10)
+            self.assertLessEqual(len(left._maxes), 10)
+        self.assertEqual(right.mean(), sum(right) / 10.0)
+
+    """ test_mixed_operations
+    Testing window_deque under operations at both ends and in the middle
+
+    Purpose: pops from the growing end, rotation, insertion, removal and
+    item assignment must leave the aggregates consistent with the elements
+    """
+    def test_mixed_operations(self):
+        window = collections_window.window_deque([5, 3, 8, 1, 9, 2])
+        self.check(window)
+        self.assertEqual(window.pop(), 2)
+        self.check(window)
+        window.appendleft(0)
+        self.assertEqual(window.popleft(), 0)
+        self.check(window)
+        window.rotate(2)
+        window.insert(3, -4)
+        self.check(window)
+        window.remove(9)
+        window[0] = 20
+        del window[1]
+        self.check(window)
+        window.clear()
+        self.assertEqual(window.sum(), 0)
+        with self.assertRaises(ValueError):
+            window.min()
+
+    """ test_batch_pops
+    Testing popmany and popleftmany on window_deque
+
+    Purpose: batch pops from either end must leave the aggregates the same
+    as popping the elements one at a time
+    """
+    def test_batch_pops(self):
+        rng = random.Random(2)
+        window = collections_window.window_deque(blocksize=4)
+        window.extend(rng.randint(-100, 100) for i in range(100))
+        expected = list(window)
+        self.assertEqual(window.popleftmany(7), expected[:7])
+        self.check(window)
+        self.assertEqual(window.popmany(5), expected[:-6:-1])
+        self.check(window)
+        window.appendleft(50)
+        self.assertEqual(window.popleftmany(3), [50] + expected[7:9])
+        self.check(window)
+        self.assertEqual(window.popmany(100), expected[-6:8:-1])
+        self.assertEqual(window.sum(), 0)
+
+    """ test_rejected_values
+    Testing window_deque with values that cannot be added or compared
+
+    Purpose: a value the window rejects must leave the elements and the
+    aggregates as they were, at either end and in either direction
+    """
+    def test_rejected_values(self):
+        rng = random.Random(3)
+        window = collections_window.window_deque(maxlen=8, blocksize=4)
+        for bad in (None, 1j, None, 1j):
+            window.extend(rng.randint(-100, 100) for i in range(10))
+            values = list(window)
+            for add in (window.append, window.appendleft):
+                self.assertRaises(TypeError, add, bad)
+                self.assertEqual(list(window), values)
+            for i in range(30):
+                if rng.random() < 0.5:
+                    window.append(rng.randint(-100, 100))
+                else:
+                    window.popleft()
+                self.check(window)
+            window.extendleft(rng.randint(-100, 100) for i in range(10))
+            self.check(window)
+
+    """ test_float_sums
+    Testing the sum of a window_deque of floats
+
+    Purpose: the running sum must not keep the rounding error of large
+    values that have left the window, whichever end it fills from
+    """
+    def test_float_sums(self):
+        right = collections_window.window_deque(maxlen=3)
+        left = collections_window.window_deque(maxlen=3)
+        for x in (1e16, 1.0, 1.0, 1.0):
+            right.append(x)
+            left.appendleft(x)
+        self.assertEqual((right.sum(), left.sum()), (3.0, 3.0))
+        self.assertEqual(right.mean(), 1.0)
+        rng = random.Random(4)
+        window = collections_window.window_deque(maxlen=20, blocksize=4)
+        for i in range(2000):
+            x = rng.uniform(-1, 1) * 10.0 ** rng.choice((-3, 0, 8, 16))
+            window.append(x)
+            if i % 7 == 6:
+                window.popleft()
+            self.assertAlmostEqual(window.sum(), math.fsum(window),
+                                   delta=1e-12 * max(map(abs, window)))
+        window.popmany(17)
+        self.assertEqual(window.sum(), math.fsum(window))